@@ -1,5 +1,11 @@
+from ipaddress import ip_address
+
 from django.contrib import admin
+from django.db.models import Count
+
 from .models import AuditLog, CategoriaPainel, PainelBI
+from .pagination import EstimatedCountPaginator
+from .search import search_audit_logs
 
 
 class PainelBIInline(admin.TabularInline):
@@ -20,9 +26,14 @@ class CategoriaPainelAdmin(admin.ModelAdmin):
     ordering = ['ordem', 'nome']
     inlines = [PainelBIInline]
 
+    def get_queryset(self, request):
+        # Contagem em uma única consulta (em vez de um COUNT por linha)
+        return super().get_queryset(request).annotate(_total_paineis=Count('paineis'))
+
     def total_paineis(self, obj):
-        return obj.paineis.count()
+        return obj._total_paineis
     total_paineis.short_description = 'Nº Painéis'
+    total_paineis.admin_order_field = '_total_paineis'
 
 
 @admin.register(PainelBI)
@@ -59,14 +70,35 @@ class PainelBIAdmin(admin.ModelAdmin):
 class AuditLogAdmin(admin.ModelAdmin):
     """
     Configuração do admin para visualização dos logs de auditoria
+
+    Preparado para tabelas com milhões de linhas: sem COUNT(*) da tabela
+    inteira (EstimatedCountPaginator e show_full_result_count desligado),
+    busca pelos índices de texto (search_audit_logs) ou pelo IP exato,
+    navegação por datas sem SELECT DISTINCT (template do changelist) e
+    ordenação apenas por timestamp.
     """
     list_display = ['timestamp', 'username', 'action', 'description', 'ip_address', 'severity']
     list_filter = ['action', 'severity', 'timestamp']
     search_fields = ['username', 'description', 'ip_address']
+    search_help_text = 'Usuário, descrição ou URL (por prefixo das palavras), ou um IP completo'
     readonly_fields = ['user', 'username', 'action', 'description', 'severity', 
                       'ip_address', 'user_agent', 'path', 'method', 'extra_data', 'timestamp']
+    raw_id_fields = ['user']
     date_hierarchy = 'timestamp'
     ordering = ['-timestamp']
+    sortable_by = ['timestamp']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Busca indexada: FTS5/trigramas nos textos ou igualdade no IP"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        try:
+            return queryset.filter(ip_address=str(ip_address(search_term))), False
+        except ValueError:
+            return search_audit_logs(queryset, search_term), False
     
     def has_add_permission(self, request):
         """Não permite adicionar logs manualmente"""
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import metrics, signals  # noqa: F401
+
+        connection_created.connect(metrics.install_db_wrapper, dispatch_uid='paineis_metrics_db_wrapper')
@@ -0,0 +1,399 @@
+"""
+Buffer de gravação em lote para os logs de auditoria.
+
+Eventos de alto volume (ex.: VIEW) são acumulados em memória, por processo
+(worker do Gunicorn), e gravados com bulk_create por uma thread em segundo
+plano quando o buffer atinge MAX_SIZE, a cada FLUSH_INTERVAL segundos ou no
+encerramento do processo. As demais ações continuam sendo gravadas na hora.
+
+Eventos repetidos podem ainda ser agrupados (AuditCoalescer): o primeiro
+evento de cada (usuário, ação, caminho) é gravado normalmente e abre uma
+janela de COALESCE_WINDOW segundos; as repetições dentro dela só incrementam
+um contador em memória. Ao fim da janela, a mesma thread grava o total de
+ocorrências e o primeiro/último horário em extra_data da linha original (um
+UPDATE por janela, em vez de um INSERT por evento). Cada worker mantém as
+próprias janelas. A política (quais ações, amostragem) fica em
+accounts/audit_utils.py.
+
+Configuração (settings.AUDIT_LOG_BUFFER):
+    ENABLED: liga/desliga o buffer (desligado = gravação síncrona, sem
+        agrupamento)
+    MAX_SIZE: nº de eventos pendentes que dispara uma gravação
+    FLUSH_INTERVAL: intervalo máximo (segundos) entre gravações
+    BATCHED_ACTIONS: ações que podem ser gravadas em lote
+    COALESCE_ACTIONS: ações cujos eventos repetidos são agrupados
+    COALESCE_WINDOW: duração (segundos) da janela de agrupamento
+    COALESCE_MAX_KEYS: nº máximo de janelas abertas por processo (acima
+        disso os eventos novos são gravados sem agrupamento)
+    SAMPLE_RATES: fração dos eventos gravada por ação (ex.: {'VIEW': 0.5})
+
+As views assíncronas também usam uma thread de gravação (submit_audit_task)
+para que nenhum log de auditoria seja aguardado pela resposta.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MAX_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'BATCHED_ACTIONS': ['VIEW'],
+    'COALESCE_ACTIONS': [],
+    'COALESCE_WINDOW': 60,
+    'COALESCE_MAX_KEYS': 10000,
+    'SAMPLE_RATES': {},
+}
+
+# Limite de eventos mantidos em memória caso o banco esteja indisponível
+MAX_PENDING_FACTOR = 10
+
+
+def get_config():
+    """Retorna a configuração do buffer mesclada com os valores padrão"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'AUDIT_LOG_BUFFER', {}))
+    return config
+
+
+def is_batched(action):
+    """Indica se a ação pode ser gravada em lote"""
+    config = get_config()
+    return config['ENABLED'] and action in config['BATCHED_ACTIONS']
+
+
+class AuditLogBuffer:
+    """
+    Fila de AuditLog pendentes de um processo.
+    Thread-safe; a thread de gravação é iniciada sob demanda.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, entry):
+        """Enfileira um AuditLog (não salvo) para gravação posterior"""
+        config = get_config()
+        with self._lock:
+            self._pending.append(entry)
+            size = len(self._pending)
+        self._ensure_thread()
+        if size >= config['MAX_SIZE']:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Grava todos os eventos pendentes com um único bulk_create e
+        atualiza as estatísticas agregadas na mesma transação.
+
+        Returns:
+            int: Quantidade de eventos gravados
+        """
+        with self._lock:
+            entries, self._pending = self._pending, []
+        if not entries:
+            return 0
+
+        from .audit_stats import record_audit_stats
+        from .models import AuditLog
+
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_create(entries)
+                record_audit_stats(entries)
+        except Exception:
+            logger.exception('Falha ao gravar %d logs de auditoria em lote', len(entries))
+            # Devolve ao buffer para nova tentativa, sem crescer indefinidamente
+            limit = get_config()['MAX_SIZE'] * MAX_PENDING_FACTOR
+            with self._lock:
+                self._pending[:0] = entries
+                dropped = self._pending[:-limit]
+                del self._pending[:-limit]
+            if dropped:
+                logger.warning('Buffer de auditoria cheio: %d logs descartados', len(dropped))
+                # As linhas nunca serão gravadas: as janelas que elas abriram
+                # absorveriam os eventos seguintes
+                audit_coalescer.discard(dropped)
+            return 0
+        return len(entries)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name='audit-log-flusher', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(get_config()['FLUSH_INTERVAL'])
+            self._wakeup.clear()
+            try:
+                self.flush()
+                # Depois do flush: as linhas das janelas já têm pk
+                audit_coalescer.close()
+            finally:
+                # Conexões são por thread; não mantém a conexão ociosa aberta
+                connections.close_all()
+
+    def _reset_after_fork(self):
+        # Threads não sobrevivem ao fork: o processo filho começa do zero
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+
+audit_buffer = AuditLogBuffer()
+
+
+class _Window:
+    """Janela de agrupamento aberta pelo primeiro evento de uma chave"""
+
+    __slots__ = ('entry', 'initial', 'occurrences', 'first_seen', 'last_seen', 'deadline')
+
+    def __init__(self, entry, weight, window):
+        self.entry = entry
+        self.initial = weight
+        self.occurrences = weight
+        self.first_seen = self.last_seen = entry.timestamp
+        self.deadline = entry.timestamp + timedelta(seconds=window)
+
+    @property
+    def repeated(self):
+        return self.occurrences > self.initial
+
+    def extra_data(self):
+        """extra_data final da linha, com o total de ocorrências da janela"""
+        return dict(
+            self.entry.extra_data or {},
+            occurrences=self.occurrences,
+            first_seen=self.first_seen.isoformat(),
+            last_seen=self.last_seen.isoformat(),
+        )
+
+
+class AuditCoalescer:
+    """
+    Janelas de agrupamento dos eventos repetidos de um processo.
+    Thread-safe; as janelas vencidas são fechadas pela thread do buffer.
+    """
+
+    def __init__(self, on_open=None):
+        """
+        Args:
+            on_open: Chamado ao abrir uma janela (ex.: iniciar a thread que
+                fecha as janelas vencidas)
+        """
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._closing = []
+        self._on_open = on_open
+
+    def __len__(self):
+        return len(self._windows)
+
+    def offer(self, key, entry, weight=1, config=None):
+        """
+        Registra um evento (AuditLog ainda não gravado).
+
+        Args:
+            key: Chave de agrupamento (usuário, ação, caminho)
+            entry: AuditLog do evento
+            weight: Nº de eventos que ele representa (amostragem)
+            config: Configuração no lugar de settings.AUDIT_LOG_BUFFER
+                (usada pelo replay_audit_day)
+
+        Returns:
+            bool: True se o evento entrou em uma janela aberta (não deve ser
+                gravado); False se deve ser gravado (abriu uma janela nova)
+        """
+        config = config or get_config()
+        with self._lock:
+            current = self._windows.get(key)
+            if current is not None and entry.timestamp < current.deadline:
+                current.occurrences += weight
+                current.last_seen = max(current.last_seen, entry.timestamp)
+                return True
+            if current is not None:
+                self._closing.append(current)
+            elif len(self._windows) >= config['COALESCE_MAX_KEYS']:
+                return False
+            self._windows[key] = _Window(entry, weight, config['COALESCE_WINDOW'])
+        if self._on_open:
+            self._on_open()
+        return False
+
+    def expire(self, now=None, force=False):
+        """
+        Retira as janelas vencidas (todas, com force=True).
+
+        Janelas cuja linha ainda não foi gravada (pk vazio, no buffer) ficam
+        para a próxima rodada, exceto com force=True.
+
+        Returns:
+            list: Janelas que tiveram repetições (precisam de UPDATE)
+        """
+        now = now or timezone.now()
+        with self._lock:
+            expired, self._closing = self._closing, []
+            for key, window in list(self._windows.items()):
+                if force or (window.deadline <= now and window.entry.pk is not None):
+                    expired.append(window)
+                    del self._windows[key]
+        return [window for window in expired if window.repeated and window.entry.pk is not None]
+
+    def discard(self, entries):
+        """Descarta as janelas abertas por eventos que não serão gravados"""
+        # AuditLog sem pk não é hashable: compara pela identidade
+        dropped = {id(entry) for entry in entries}
+        with self._lock:
+            for key, window in list(self._windows.items()):
+                if id(window.entry) in dropped:
+                    del self._windows[key]
+            self._closing = [window for window in self._closing if id(window.entry) not in dropped]
+
+    def close(self, force=False):
+        """
+        Grava o total de ocorrências das janelas vencidas (bulk_update) e
+        soma as repetições às estatísticas agregadas.
+
+        Returns:
+            int: Linhas atualizadas
+        """
+        windows = self.expire(force=force)
+        if not windows:
+            return 0
+
+        from .audit_stats import record_audit_repeats
+        from .models import AuditLog
+
+        for window in windows:
+            window.entry.extra_data = window.extra_data()
+        entries = [window.entry for window in windows]
+        try:
+            with transaction.atomic():
+                AuditLog.objects.bulk_update(entries, ['extra_data'], batch_size=500)
+                record_audit_repeats([(window.entry, window.occurrences - window.initial) for window in windows])
+        except Exception:
+            logger.exception('Falha ao gravar o agrupamento de %d logs de auditoria', len(entries))
+            return 0
+        return len(entries)
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._closing = []
+
+
+audit_coalescer = AuditCoalescer(on_open=audit_buffer._ensure_thread)
+
+
+def flush_audit_buffer():
+    """
+    Grava imediatamente os eventos pendentes deste processo e fecha todas
+    as janelas de agrupamento.
+
+    Returns:
+        int: Quantidade de eventos gravados pelo buffer
+    """
+    written = audit_buffer.flush()
+    audit_coalescer.close(force=True)
+    return written
+
+
+# Thread única que executa as gravações agendadas pelas views assíncronas.
+# A fila tem o mesmo limite do buffer (MAX_SIZE * MAX_PENDING_FACTOR): com o
+# banco lento, as tarefas excedentes são descartadas em vez de acumular
+# memória sem limite.
+_executor = None
+_executor_slots = None
+_executor_lock = threading.Lock()
+_dropped_tasks = 0
+
+
+def _run_audit_task(slots, func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Falha ao gravar log de auditoria em segundo plano')
+    finally:
+        slots.release()
+        close_old_connections()
+
+
+def submit_audit_task(func, *args, **kwargs):
+    """
+    Executa func(*args, **kwargs) na thread de gravação da auditoria, sem
+    esperar pelo resultado. As tarefas rodam em ordem de chegada.
+
+    Returns:
+        Future da tarefa, ou None se a fila estava cheia e ela foi descartada
+    """
+    global _executor, _executor_slots, _dropped_tasks
+    limit = get_config()['MAX_SIZE'] * MAX_PENDING_FACTOR
+    with _executor_lock:
+        if _executor is None:
+            _executor_slots = threading.BoundedSemaphore(limit)
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audit-log-writer')
+        executor, slots = _executor, _executor_slots
+        if not slots.acquire(blocking=False):
+            _dropped_tasks += 1
+            dropped = _dropped_tasks
+            executor = None
+    if executor is None:
+        # Avisa no primeiro descarte e depois a cada fila cheia descartada
+        if dropped == 1 or dropped % limit == 0:
+            logger.warning('Fila de gravação da auditoria cheia: %d logs descartados até agora', dropped)
+        return None
+    return executor.submit(_run_audit_task, slots, func, args, kwargs)
+
+
+def dropped_audit_tasks():
+    """Nº de gravações descartadas por fila cheia desde o início do processo"""
+    return _dropped_tasks
+
+
+def wait_audit_tasks():
+    """Aguarda as gravações agendadas e encerra a thread (recriada sob demanda)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _reset_executor_after_fork():
+    global _executor, _executor_slots, _executor_lock
+    _executor = None
+    _executor_slots = None
+    _executor_lock = threading.Lock()
+
+
+# atexit executa na ordem inversa: primeiro as tarefas agendadas, depois o buffer
+atexit.register(flush_audit_buffer)
+atexit.register(wait_audit_tasks)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=audit_buffer._reset_after_fork)
+    os.register_at_fork(after_in_child=audit_coalescer._reset_after_fork)
+    os.register_at_fork(after_in_child=_reset_executor_after_fork)
@@ -0,0 +1,123 @@
+"""
+Estatísticas agregadas (rollup) dos logs de auditoria.
+
+A tabela AuditLogStats guarda um total de eventos por (dia, ação,
+severidade) e é incrementada junto com cada gravação de AuditLog (um log
+agrupado conta todas as suas ocorrências), de modo que os cartões de
+totais e as tendências são lidos em tempo constante, sem COUNT(*) na tabela
+de logs. O comando rebuild_audit_stats recalcula a tabela a partir dos logs.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import AuditLogStats
+
+
+def _stats_key(entry):
+    return timezone.localdate(entry.timestamp), entry.action, entry.severity
+
+
+def audit_occurrences(entry):
+    """
+    Nº de eventos representados por um log: 1, ou extra_data['occurrences']
+    quando ele agrupa repetições ou foi mantido por amostragem (ver
+    accounts/audit_utils.py).
+    """
+    extra = entry.extra_data
+    if isinstance(extra, dict):
+        return extra.get('occurrences', 1)
+    return 1
+
+
+def record_audit_stats(entries):
+    """
+    Incrementa os totais para os logs recém-gravados.
+
+    Args:
+        entries: Lista de AuditLog já gravados
+    """
+    totals = Counter()
+    for entry in entries:
+        totals[_stats_key(entry)] += audit_occurrences(entry)
+    add_audit_stats(totals)
+
+
+def record_audit_repeats(repeats):
+    """
+    Soma ocorrências agrupadas depois da gravação de logs já contados.
+
+    Args:
+        repeats: Lista de (AuditLog, nº de ocorrências adicionais)
+    """
+    totals = Counter()
+    for entry, extra in repeats:
+        totals[_stats_key(entry)] += extra
+    add_audit_stats(totals)
+
+
+def add_audit_stats(totals):
+    """
+    Soma totais já agrupados à tabela agregada.
+
+    Args:
+        totals: Mapeamento {(dia, ação, severidade): quantidade}
+    """
+    for (dia, action, severity), total in totals.items():
+        lookup = {'dia': dia, 'action': action, 'severity': severity}
+        if AuditLogStats.objects.filter(**lookup).update(total=F('total') + total):
+            continue
+        try:
+            with transaction.atomic():
+                AuditLogStats.objects.create(total=total, **lookup)
+        except IntegrityError:
+            # Outro processo criou a linha entre o UPDATE e o INSERT
+            AuditLogStats.objects.filter(**lookup).update(total=F('total') + total)
+
+
+def stats_total(**filters):
+    """
+    Soma dos totais que atendem aos filtros (ex.: action='LOGIN', dia=date).
+    """
+    return AuditLogStats.objects.filter(**filters).aggregate(soma=Sum('total'))['soma'] or 0
+
+
+async def astats_total(**filters):
+    """Versão assíncrona de stats_total"""
+    result = await AuditLogStats.objects.filter(**filters).aaggregate(soma=Sum('total'))
+    return result['soma'] or 0
+
+
+def daily_trend(days=7):
+    """
+    Totais diários dos últimos `days` dias (incluindo hoje).
+
+    Returns:
+        list: dicts com dia, total, logins e acessos_negados, do mais antigo ao mais recente
+    """
+    hoje = timezone.localdate()
+    inicio = hoje - timedelta(days=days - 1)
+    trend = {
+        inicio + timedelta(days=i): {'dia': inicio + timedelta(days=i), 'total': 0,
+                                     'logins': 0, 'acessos_negados': 0}
+        for i in range(days)
+    }
+    rows = (
+        AuditLogStats.objects.filter(dia__gte=inicio)
+        .values('dia', 'action')
+        .annotate(soma=Sum('total'))
+    )
+    for row in rows:
+        item = trend.get(row['dia'])
+        if item is None:
+            continue
+        item['total'] += row['soma']
+        if row['action'] == 'LOGIN':
+            item['logins'] += row['soma']
+        elif row['action'] == 'ACCESS_DENIED':
+            item['acessos_negados'] += row['soma']
+    return list(trend.values())
@@ -1,9 +1,27 @@
 """
 Utilitários para registro de logs de auditoria.
 Funções helper para facilitar o registro de ações no sistema.
+
+Política de volume (settings.AUDIT_LOG_BUFFER, ver accounts/audit_buffer.py):
+- Amostragem (SAMPLE_RATES): só uma fração dos eventos da ação é gravada;
+  cada log mantido representa 1/fração eventos (extra_data['occurrences']).
+- Agrupamento (COALESCE_ACTIONS): eventos iguais (usuário, ação, caminho)
+  dentro de COALESCE_WINDOW segundos viram uma linha, com occurrences,
+  first_seen e last_seen em extra_data.
+Ações de segurança (NEVER_SAMPLED) nunca são amostradas nem agrupadas.
 """
 
+import random
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+
 from .models import AuditLog
+from .audit_buffer import audit_buffer, audit_coalescer, get_config, is_batched, submit_audit_task
+from .audit_stats import record_audit_stats
+
+# Cada tentativa de login (inclusive as falhas) e cada exclusão ficam registradas
+NEVER_SAMPLED = frozenset({'LOGIN', 'DELETE'})
 
 
 def get_client_ip(request):
@@ -18,6 +36,45 @@ def get_client_ip(request):
     return ip
 
 
+def sample_rate(action, config=None):
+    """Fração (0-1) dos eventos da ação que é gravada"""
+    if action in NEVER_SAMPLED:
+        return 1.0
+    config = config or get_config()
+    return float(config['SAMPLE_RATES'].get(action, 1.0))
+
+
+def sample_weight(action, rng=random, config=None):
+    """
+    Decide se um evento entra na amostra.
+
+    Returns:
+        int: Nº de eventos que o log representa (0 = descartado)
+    """
+    rate = sample_rate(action, config)
+    if rate >= 1:
+        return 1
+    if rate <= 0 or rng.random() >= rate:
+        return 0
+    return max(1, round(1 / rate))
+
+
+def is_coalesced(action, config=None):
+    """Indica se os eventos repetidos da ação são agrupados"""
+    config = config or get_config()
+    return (
+        config['ENABLED']
+        and action in config['COALESCE_ACTIONS']
+        and action not in NEVER_SAMPLED
+    )
+
+
+def coalesce_key(entry):
+    """Chave de agrupamento: usuário (ou anônimo + IP), ação e caminho"""
+    who = entry.user_id or f'{entry.username}@{entry.ip_address}'
+    return who, entry.action, entry.path
+
+
 def log_action(user, action, description, request=None, severity='INFO', extra_data=None):
     """
     Registra uma ação de auditoria no sistema.
@@ -30,8 +87,14 @@ def log_action(user, action, description, request=None, severity='INFO', extra_d
         severity: Nível de severidade (INFO, WARNING, ERROR, CRITICAL)
         extra_data: Dicionário com dados adicionais (opcional)
     
+    Ações configuradas em AUDIT_LOG_BUFFER['BATCHED_ACTIONS'] (ex.: VIEW) são
+    enfileiradas e gravadas em lote fora da requisição; as demais são gravadas
+    imediatamente. Eventos descartados pela amostragem ou agrupados em uma
+    linha anterior não são gravados.
+    
     Returns:
-        AuditLog: Objeto criado
+        AuditLog: Objeto criado (não salvo se enfileirado ou agrupado), ou
+            None se descartado pela amostragem
     """
     log_data = {
         'user': user if user and user.is_authenticated else None,
@@ -51,7 +114,42 @@ def log_action(user, action, description, request=None, severity='INFO', extra_d
             'method': request.method,
         })
     
-    return AuditLog.objects.create(**log_data)
+    weight = sample_weight(action)
+    if not weight:
+        return None
+    if weight > 1:
+        log_data['extra_data'] = dict(extra_data or {}, occurrences=weight, sample_rate=sample_rate(action))
+    
+    entry = AuditLog(**log_data)
+    if request and is_coalesced(action) and audit_coalescer.offer(coalesce_key(entry), entry, weight):
+        return entry
+    
+    if is_batched(action):
+        audit_buffer.add(entry)
+        return entry
+    
+    with transaction.atomic():
+        entry.save(force_insert=True)
+        record_audit_stats([entry])
+    return entry
+
+
+async def alog(log_func, *args, **kwargs):
+    """
+    Executa um helper de log (log_view, log_access_denied, ...) a partir de
+    uma view assíncrona.
+
+    Com o buffer ligado, a gravação é agendada na thread de auditoria e a
+    resposta não espera pelo banco. Com o buffer desligado, a gravação é
+    aguardada (mesmo comportamento síncrono das views comuns).
+
+    Uso:
+        await alog(log_view, user, request, 'Home')
+    """
+    if get_config()['ENABLED']:
+        submit_audit_task(log_func, *args, **kwargs)
+    else:
+        await sync_to_async(log_func)(*args, **kwargs)
 
 
 def log_login(user, request, success=True):
@@ -0,0 +1,266 @@
+"""
+Utilitários para benchmarks HTTP dos painéis.
+
+Sobe o servidor (Gunicorn) em um subprocesso, autentica clientes HTTP
+simples (somente biblioteca padrão) e mede requisições/segundo e latência
+com várias threads concorrentes.
+"""
+
+import http.cookiejar
+import os
+import resource
+import secrets
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpClient:
+    """Cliente HTTP com cookies (sessão + CSRF), um por thread"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies)
+        )
+        # POST não segue o redirecionamento (mede só a própria requisição)
+        self.post_opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect
+        )
+
+    def _cookie(self, name):
+        for cookie in self.cookies:
+            if cookie.name == name:
+                return cookie.value
+        return None
+
+    def get(self, path):
+        """Executa um GET e retorna (status, tamanho do corpo)"""
+        try:
+            with self.opener.open(self.base_url + path, timeout=self.timeout) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, 0
+
+    def post(self, path, data):
+        """Executa um POST (com o token CSRF do cookie) e retorna (status, tamanho do corpo)"""
+        data = dict(data, csrfmiddlewaretoken=self._cookie('csrftoken') or '')
+        request = urllib.request.Request(
+            self.base_url + path, data=urllib.parse.urlencode(data).encode(),
+            headers={'Referer': self.base_url + path},
+        )
+        try:
+            with self.post_opener.open(request, timeout=self.timeout) as response:
+                return response.status, len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, 0
+
+    def login(self, username, password):
+        """Autentica pelo formulário de login (mesmo fluxo do navegador)"""
+        self.get('/login/')
+        self.post('/login/', {'username': username, 'password': password})
+        return self._cookie('sessionid') is not None
+
+
+def wait_for_server(base_url, timeout=30):
+    """Aguarda o servidor responder (qualquer status HTTP)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/login/', timeout=2).read()
+            return True
+        except urllib.error.HTTPError:
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+@contextmanager
+def benchmark_user(username, groups=()):
+    """
+    Usuário do benchmark com uma senha aleatória válida só durante a medição;
+    ao final (mesmo com erro) a senha fica inutilizável e o usuário sai dos
+    grupos em que foi incluído.
+
+    Args:
+        username: nome do usuário (criado se não existir)
+        groups: nomes dos grupos necessários às páginas medidas
+
+    Yields:
+        tuple: (usuário, senha)
+    """
+    user, _ = User.objects.get_or_create(username=username)
+    password = secrets.token_urlsafe(16)
+    user.set_password(password)
+    user.save(update_fields=['password'])
+    added = [
+        group for group in (Group.objects.get_or_create(name=name)[0] for name in groups)
+        if not user.groups.filter(pk=group.pk).exists()
+    ]
+    user.groups.add(*added)
+    try:
+        yield user, password
+    finally:
+        user.groups.remove(*added)
+        user.set_unusable_password()
+        user.save(update_fields=['password'])
+
+
+@contextmanager
+def gunicorn_server(port, workers=3, timeout=120, env=None, extra_args=None,
+                    app='paineis_bi.wsgi:application', worker_class='sync', threads=1):
+    """
+    Sobe o Gunicorn com o perfil de gunicorn.conf.py (lido automaticamente
+    do diretório do projeto); os argumentos abaixo têm precedência.
+
+    O tipo de worker, as threads e a reciclagem (--max-requests 0) são
+    sempre explícitos: o perfil de produção (gthread com 4 threads, workers
+    reciclados com jitter) mudaria o que está sendo medido no meio da rodada.
+
+    Args:
+        port: Porta local
+        workers: Nº de workers
+        timeout: Timeout dos workers (segundos)
+        env: Variáveis de ambiente adicionais (ex.: AUDIT_LOG_BUFFER)
+        extra_args: Argumentos extras para o Gunicorn
+        app: Aplicação WSGI/ASGI
+        worker_class: Tipo de worker (sync, gthread, uvicorn_worker.UvicornWorker)
+        threads: Threads por worker (só valem para gthread)
+    """
+    process_env = dict(os.environ)
+    process_env.update(env or {})
+    command = [
+        sys.executable, '-m', 'gunicorn', app,
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--worker-class', worker_class,
+        '--threads', str(threads),
+        '--max-requests', '0',
+        '--timeout', str(timeout),
+        '--log-level', 'warning',
+    ] + list(extra_args or [])
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=process_env)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        if not wait_for_server(base_url):
+            raise RuntimeError('Gunicorn não respondeu a tempo')
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def percentile(values, pct):
+    """Percentil (0-100) de uma lista de valores"""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+def peak_rss_kb(children=False):
+    """
+    Pico de memória residente (KiB) deste processo ou, com children=True, do
+    maior subprocesso já encerrado (ex.: os workers do Gunicorn).
+    """
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def process_tree_cpu_seconds(pid):
+    """
+    Tempo de CPU (usuário + sistema, em segundos) de um processo e dos seus
+    filhos vivos (ex.: o master do Gunicorn e os workers). Lê o /proc, ou
+    seja, só funciona no Linux.
+    """
+    ticks = os.sysconf('SC_CLK_TCK')
+    total = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # O nome do processo (campo 2) pode ter espaços; os demais vêm após o ")"
+        fields = stat.rsplit(')', 1)[1].split()
+        if int(entry) == pid or int(fields[1]) == pid:
+            total += int(fields[11]) + int(fields[12])
+    return total / ticks
+
+
+def run_load(clients, path, duration, request=None):
+    """
+    Dispara requisições GET em paralelo (uma thread por cliente) durante
+    `duration` segundos.
+
+    Args:
+        request: Função request(client) -> status usada no lugar do GET em
+            `path` (ex.: um fluxo de login)
+
+    Returns:
+        dict: requests, errors, elapsed, rps, p50, p95, p99 (latências em ms)
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(client):
+        local_latencies = []
+        local_errors = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                status = request(client) if request else client.get(path)[0]
+            except OSError:
+                status = None
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                local_errors += 1
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+    }
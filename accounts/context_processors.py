@@ -0,0 +1,13 @@
+"""
+Context processors do app accounts.
+"""
+
+from .permissions import get_user_permissions
+
+
+def permissoes(request):
+    """Disponibiliza os grupos do usuário (do snapshot da sessão) nos templates"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'user_group_names': get_user_permissions(request)['group_names']}
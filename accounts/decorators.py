@@ -15,14 +15,27 @@ def outra_view(request):
 """
 
 from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from .permissions import aget_user_permissions, get_user_permissions
+
+
+def _access_denied(request, groups):
+    # Usuário não tem permissão
+    messages.error(
+        request,
+        f'Você não tem permissão para acessar esta página. '
+        f'Grupos necessários: {", ".join(groups)}'
+    )
+    return redirect('accounts:home')
 
 
 def group_required(*group_names):
     """
     Decorator para verificar se o usuário pertence a um ou mais grupos.
+    Aceita views síncronas e assíncronas.
     
     Args:
         *group_names: Nome(s) do(s) grupo(s) permitidos
@@ -31,19 +44,37 @@ def group_required(*group_names):
         @group_required('Gestão')
         @group_required('Gestão', 'Unidades')
     """
+    # Converte para lista se for string única
+    groups = group_names if isinstance(group_names, (list, tuple)) else [group_names]
+
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            @login_required
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if user.is_superuser:
+                    return await view_func(request, *args, **kwargs)
+                
+                user_groups = (await aget_user_permissions(request, user))['group_names']
+                if any(group in user_groups for group in groups):
+                    return await view_func(request, *args, **kwargs)
+                
+                from .audit_utils import alog, log_access_denied
+                await alog(log_access_denied, user, request, request.path)
+                return _access_denied(request, groups)
+            
+            return async_wrapper
+
         @wraps(view_func)
         @login_required
         def wrapper(request, *args, **kwargs):
-            # Converte para lista se for string única
-            groups = group_names if isinstance(group_names, (list, tuple)) else [group_names]
-            
             # Verifica se o usuário é superuser (acesso total)
             if request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
             
-            # Verifica se o usuário pertence a algum dos grupos
-            user_groups = request.user.groups.values_list('name', flat=True)
+            # Verifica se o usuário pertence a algum dos grupos (snapshot da sessão)
+            user_groups = get_user_permissions(request)['group_names']
             
             if any(group in user_groups for group in groups):
                 return view_func(request, *args, **kwargs)
@@ -52,13 +83,7 @@ def group_required(*group_names):
             from .audit_utils import log_access_denied
             log_access_denied(request.user, request, request.path)
             
-            # Usuário não tem permissão
-            messages.error(
-                request,
-                f'Você não tem permissão para acessar esta página. '
-                f'Grupos necessários: {", ".join(groups)}'
-            )
-            return redirect('accounts:home')
+            return _access_denied(request, groups)
         
         return wrapper
     return decorator
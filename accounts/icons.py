@@ -0,0 +1,39 @@
+"""
+Ícones disponíveis no subconjunto da fonte Bootstrap Icons servido pelo
+sistema (static/vendor/bootstrap-icons/, gerado pelo comando subset_icons).
+
+Um ícone fora do subconjunto aparece em branco; por isso o campo icone de
+CategoriaPainel/PainelBI só aceita as classes presentes no CSS gerado.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+SUBSET_CSS = Path('static') / 'vendor' / 'bootstrap-icons' / 'bootstrap-icons.css'
+ICON_RULE_RE = re.compile(r'\.(bi-[a-z0-9-]+)::before\{content:"\\([0-9a-f]+)"\}')
+
+
+@lru_cache(maxsize=1)
+def available_icons():
+    """Classes bi-* do subconjunto gerado; None se o CSS não existir"""
+    path = Path(settings.BASE_DIR) / SUBSET_CSS
+    if not path.exists():
+        return None
+    return frozenset(name for name, _ in ICON_RULE_RE.findall(path.read_text(encoding='utf-8')))
+
+
+def validate_icon(value):
+    """Recusa classes que não estão no subconjunto da fonte"""
+    icons = available_icons()
+    if icons is None or value in icons:
+        return
+    raise ValidationError(
+        '"%(value)s" não está na fonte de ícones do sistema. Use um destes: %(icons)s; '
+        'para outro ícone, gere a fonte com "python manage.py subset_icons --extra %(value)s".',
+        code='invalid_icon',
+        params={'value': value, 'icons': ', '.join(sorted(icons))},
+    )
@@ -0,0 +1,200 @@
+"""
+Limite de tentativas de login antes da autenticação.
+
+Cada tentativa malsucedida custa um hash PBKDF2 completo, uma consulta e um
+log de auditoria. Em um ataque de credential stuffing isso ocupa todos os
+workers e inunda a tabela de auditoria; por isso as tentativas que excedem o
+limite são recusadas consultando apenas o cache compartilhado, antes de
+qualquer hash ou acesso ao banco.
+
+O limite usa uma janela deslizante aproximada (contador da janela atual +
+contador da anterior ponderado pelo tempo restante), com chaves por IP
+(throttle_ip) e por nome de usuário. Só tentativas que falharam contam;
+um login bem-sucedido zera o contador do usuário.
+
+O IP é o REMOTE_ADDR. O X-Forwarded-For é escrito pelo cliente e um atacante
+trocaria o valor a cada tentativa; ele só é lido com TRUSTED_PROXIES > 0, e
+então vale o endereço acrescentado pelo proxy confiável mais externo.
+
+As tentativas recusadas não geram um log cada: são somadas no cache e
+registradas em um único evento de auditoria a cada REPORT_INTERVAL segundos
+por IP/usuário. O que sobrar ao fim de um ataque entra no evento da próxima
+tentativa desse IP/usuário.
+
+Os contadores ficam em um cache próprio (CACHE), para que sessões e menus
+não os empurrem para fora. Com o FileBasedCache o incremento não é atômico
+entre processos e, acima de MAX_ENTRIES, chaves são descartadas ao acaso; em
+produção prefira o Redis (LOGIN_THROTTLE_CACHE_BACKEND).
+
+Configuração (settings.LOGIN_THROTTLE):
+    ENABLED: liga/desliga o limite
+    WINDOW: tamanho da janela (segundos)
+    IP_LIMIT: tentativas malsucedidas por IP na janela
+    USERNAME_LIMIT: tentativas malsucedidas por usuário na janela
+    REPORT_INTERVAL: intervalo mínimo (segundos) entre eventos de auditoria
+        de tentativas bloqueadas de um mesmo IP/usuário
+    TRUSTED_PROXIES: nº de proxies reversos confiáveis na frente da aplicação
+        (0 = X-Forwarded-For ignorado)
+    CACHE: alias em settings.CACHES onde ficam os contadores
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .audit_utils import log_action
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WINDOW': 300,
+    'IP_LIMIT': 20,
+    'USERNAME_LIMIT': 10,
+    'REPORT_INTERVAL': 60,
+    'TRUSTED_PROXIES': 0,
+    'CACHE': 'default',
+}
+
+KEY_PREFIX = 'login_throttle'
+SCOPE_LABELS = {'ip': 'IP', 'username': 'usuário'}
+
+
+def get_config():
+    """Retorna a configuração do limite mesclada com os valores padrão"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'LOGIN_THROTTLE', {}))
+    return config
+
+
+def _digest(value):
+    # Nomes de usuário podem ter caracteres inválidos em chaves do memcached
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+def throttle_ip(request, trusted_proxies=0):
+    """
+    IP usado nas chaves do limite. Cada proxy acrescenta ao fim do
+    X-Forwarded-For o endereço de quem o chamou; com N proxies confiáveis,
+    o N-ésimo endereço a partir da direita é o do cliente e os anteriores
+    podem ter sido forjados.
+    """
+    if trusted_proxies:
+        hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        hops = [hop for hop in hops if hop]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class LoginThrottle:
+    """
+    Estado do limite para uma tentativa de login (um IP + um usuário).
+
+    Todos os contadores envolvidos são lidos de uma vez (get_many) na
+    criação; as gravações acontecem só em record_failure, record_success e
+    reject.
+    """
+
+    def __init__(self, request, username, now=None):
+        self.config = get_config()
+        self.request = request
+        self.cache = caches[self.config['CACHE']]
+        self.window = self.config['WINDOW']
+        now = time.time() if now is None else now
+        bucket = int(now // self.window)
+        # Peso da janela anterior: quanto dela ainda está dentro da janela deslizante
+        self.previous_weight = 1 - (now % self.window) / self.window
+
+        self.values = {
+            'ip': throttle_ip(request, self.config['TRUSTED_PROXIES']),
+            'username': username.casefold(),
+        }
+        self.limits = {'ip': self.config['IP_LIMIT'], 'username': self.config['USERNAME_LIMIT']}
+        self.keys = {}
+        for scope, value in self.values.items():
+            base = f'{KEY_PREFIX}:{scope}:{_digest(value)}'
+            self.keys[scope] = {
+                'previous': f'{base}:{bucket - 1}',
+                'current': f'{base}:{bucket}',
+                'blocked': f'{base}:blocked',
+                'reported': f'{base}:reported',
+            }
+        self.counts = self.cache.get_many([
+            key for keys in self.keys.values()
+            for key in (keys['previous'], keys['current'], keys['blocked'])
+        ])
+
+    def attempts(self, scope):
+        """Tentativas malsucedidas estimadas na janela deslizante"""
+        keys = self.keys[scope]
+        previous = self.counts.get(keys['previous'], 0)
+        current = self.counts.get(keys['current'], 0)
+        return previous * self.previous_weight + current
+
+    def exceeded(self):
+        """Escopos ('ip', 'username') cujo limite foi atingido"""
+        return [scope for scope in self.keys if self.attempts(scope) >= self.limits[scope]]
+
+    def _incr(self, key, timeout):
+        self.cache.add(key, 0, timeout=timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expirou entre o add e o incr
+            self.cache.set(key, 1, timeout=timeout)
+            return 1
+
+    def record_failure(self):
+        """Conta uma tentativa malsucedida e informa bloqueios pendentes"""
+        for scope in self.keys:
+            # A chave precisa sobreviver à janela seguinte, onde ela é a anterior
+            self._incr(self.keys[scope]['current'], timeout=self.window * 2)
+        self._report_pending()
+
+    def record_success(self):
+        """Login bem-sucedido: zera o contador do usuário (o do IP pode ser compartilhado)"""
+        keys = self.keys['username']
+        self.cache.delete_many([keys['previous'], keys['current']])
+        self._report_pending()
+
+    def reject(self, scopes):
+        """Soma uma tentativa recusada e registra o evento agregado quando for a hora"""
+        for scope in scopes:
+            keys = self.keys[scope]
+            self.counts[keys['blocked']] = self._incr(keys['blocked'], timeout=None)
+        self._report_pending(scopes)
+
+    def _report_pending(self, scopes=None):
+        for scope in scopes or self.keys:
+            keys = self.keys[scope]
+            pending = self.counts.get(keys['blocked'], 0)
+            if not pending or not self.cache.add(keys['reported'], True, timeout=self.config['REPORT_INTERVAL']):
+                continue
+            try:
+                self.cache.decr(keys['blocked'], pending)
+            except ValueError:
+                pass
+            self.counts[keys['blocked']] = 0
+            log_throttled(self.request, scope, self.values[scope], pending, self.limits[scope], self.window)
+
+
+def log_throttled(request, scope, value, attempts, limit, window):
+    """Registra, em um único log, as tentativas de login recusadas pelo limite"""
+    return log_action(
+        user=None,
+        action='LOGIN',
+        description=(
+            f'{attempts} tentativa(s) de login bloqueada(s) por excesso de falhas '
+            f'({SCOPE_LABELS[scope]} {value})'
+        ),
+        request=request,
+        severity='WARNING',
+        extra_data={
+            'throttled': attempts,
+            'scope': scope,
+            scope: value,
+            'limit': limit,
+            'window': window,
+        },
+    )
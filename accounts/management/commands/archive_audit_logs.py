@@ -0,0 +1,189 @@
+"""
+Command para arquivar e remover logs de auditoria antigos.
+
+Os logs mais antigos que a janela de retenção são lidos em streaming
+(.iterator), gravados em arquivos compactados (gzip) particionados por mês,
+em JSONL ou CSV, acompanhados de um manifesto (linhas, id mínimo/máximo e
+SHA-256 de cada arquivo). Só depois que todos os arquivos foram gravados as
+linhas são removidas, em lotes pequenos, para não segurar o lock de escrita
+do banco por muito tempo.
+
+As estatísticas agregadas (AuditLogStats) são mantidas: continuam
+representando o histórico completo de eventos.
+
+Uso:
+    python manage.py archive_audit_logs --dry-run
+    python manage.py archive_audit_logs --days 180 --format csv --output /backup/auditoria
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import AuditLog
+
+ARCHIVE_FIELDS = [
+    'id', 'timestamp', 'user_id', 'username', 'action', 'description', 'severity',
+    'ip_address', 'user_agent', 'path', 'method', 'extra_data',
+]
+
+
+class ArchivePartition:
+    """Arquivo compactado de um mês, com os dados para o manifesto"""
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.rows = 0
+        self.min_id = None
+        self.max_id = None
+        self._raw = gzip.open(path, 'wb')
+        self._text = io.TextIOWrapper(self._raw, encoding='utf-8', newline='')
+        self._csv = None
+        if file_format == 'csv':
+            self._csv = csv.writer(self._text)
+            self._csv.writerow(ARCHIVE_FIELDS)
+
+    def write(self, row):
+        if self._csv is not None:
+            self._csv.writerow([
+                json.dumps(row[field], ensure_ascii=False) if field == 'extra_data' and row[field] is not None
+                else row[field]
+                for field in ARCHIVE_FIELDS
+            ])
+        else:
+            self._text.write(json.dumps(row, default=str, ensure_ascii=False))
+            self._text.write('\n')
+        self.rows += 1
+        self.min_id = row['id'] if self.min_id is None else min(self.min_id, row['id'])
+        self.max_id = row['id'] if self.max_id is None else max(self.max_id, row['id'])
+
+    def close(self):
+        self._text.close()
+
+    def manifest_entry(self):
+        sha256 = hashlib.sha256()
+        with open(self.path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return {
+            'file': self.path.name,
+            'rows': self.rows,
+            'min_id': self.min_id,
+            'max_id': self.max_id,
+            'bytes': self.path.stat().st_size,
+            'sha256': sha256.hexdigest(),
+        }
+
+
+class Command(BaseCommand):
+    help = 'Arquiva (gzip JSONL/CSV por mês) e remove logs de auditoria antigos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=getattr(settings, 'AUDIT_LOG_RETENTION_DAYS', 180),
+            help='Janela de retenção em dias (padrão: AUDIT_LOG_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--output',
+            default=str(getattr(settings, 'AUDIT_LOG_ARCHIVE_DIR', settings.BASE_DIR / 'audit_archive')),
+            help='Diretório dos arquivos (padrão: AUDIT_LOG_ARCHIVE_DIR)',
+        )
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas lidas por vez')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Linhas removidas por transação')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas informa o que seria arquivado')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('A janela de retenção deve ser de pelo menos 1 dia.')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        dry_run = options['dry_run']
+        run_stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        output = Path(options['output'])
+        if not dry_run:
+            output.mkdir(parents=True, exist_ok=True)
+
+        self.stdout.write(
+            f'Arquivando logs anteriores a {timezone.localtime(cutoff):%d/%m/%Y %H:%M}'
+            f'{" (dry-run)" if dry_run else ""}...'
+        )
+
+        # Exportação em streaming, particionada por mês (fuso configurado)
+        started = time.perf_counter()
+        partitions = {}
+        counts = {}
+        max_id = None
+        rows = (
+            AuditLog.objects.filter(timestamp__lt=cutoff)
+            .order_by('id')
+            .values(*ARCHIVE_FIELDS)
+            .iterator(chunk_size=options['chunk_size'])
+        )
+        try:
+            for row in rows:
+                month = timezone.localtime(row['timestamp']).strftime('%Y-%m')
+                counts[month] = counts.get(month, 0) + 1
+                max_id = row['id']
+                if dry_run:
+                    continue
+                partition = partitions.get(month)
+                if partition is None:
+                    path = output / f'auditlog-{month}-{run_stamp}.{options["format"]}.gz'
+                    partition = partitions[month] = ArchivePartition(path, options['format'])
+                row['timestamp'] = row['timestamp'].isoformat()
+                partition.write(row)
+        finally:
+            for partition in partitions.values():
+                partition.close()
+        export_seconds = time.perf_counter() - started
+        total = sum(counts.values())
+
+        for month in sorted(counts):
+            self.stdout.write(f'  {month}: {counts[month]} logs')
+
+        if dry_run or not total:
+            self.stdout.write(self.style.SUCCESS(f'✓ {total} logs seriam arquivados'))
+            return
+
+        manifest = {
+            'created_at': timezone.now().isoformat(),
+            'cutoff': cutoff.isoformat(),
+            'format': options['format'],
+            'rows': total,
+            'partitions': [partitions[month].manifest_entry() for month in sorted(partitions)],
+        }
+        manifest_path = output / f'manifest-{run_stamp}.json'
+        manifest_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding='utf-8')
+        bytes_written = sum(entry['bytes'] for entry in manifest['partitions'])
+
+        # Remoção em lotes curtos (cada lote é uma transação)
+        started = time.perf_counter()
+        deleted = 0
+        pending = AuditLog.objects.filter(timestamp__lt=cutoff, id__lte=max_id)
+        while True:
+            ids = list(pending.order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += AuditLog.objects.filter(id__in=ids).delete()[0]
+        delete_seconds = time.perf_counter() - started
+
+        self.stdout.write(
+            f'Exportação: {total} logs em {export_seconds:.2f}s '
+            f'({total / export_seconds if export_seconds else 0:.0f} linhas/s, {bytes_written} bytes)'
+        )
+        self.stdout.write(
+            f'Remoção: {deleted} logs em {delete_seconds:.2f}s '
+            f'({deleted / delete_seconds if delete_seconds else 0:.0f} linhas/s)'
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Manifesto gravado em {manifest_path}'))
@@ -0,0 +1,65 @@
+"""
+Command para comparar a latência dos modos WSGI e ASGI com usuários simultâneos.
+
+Sobe o Gunicorn duas vezes com o mesmo nº de workers, sem reciclagem:
+workers sync de uma thread (paineis_bi.wsgi; em produção o padrão é
+gthread, ver gunicorn.conf.py) e workers uvicorn (paineis_bi.asgi, como em
+DJANGO_SERVER_MODE=asgi no entrypoint.sh), e mede a latência das páginas
+autenticadas com vários clientes concorrentes.
+
+Uso:
+    python manage.py benchmark_asgi
+    python manage.py benchmark_asgi --concurrency 48 --duration 20 --path /paineis/ --path /
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmark import HttpClient, benchmark_user, gunicorn_server, run_load
+
+from .benchmark_audit_log import BENCH_USERNAME
+
+MODES = (
+    ('WSGI', 'paineis_bi.wsgi:application', 'sync'),
+    ('ASGI', 'paineis_bi.asgi:application', 'uvicorn_worker.UvicornWorker'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Compara a latência com usuários simultâneos entre os modos WSGI e ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099, help='Porta local do Gunicorn')
+        parser.add_argument('--workers', type=int, default=3, help='Nº de workers do Gunicorn')
+        parser.add_argument('--concurrency', type=int, default=24, help='Clientes simultâneos')
+        parser.add_argument('--duration', type=float, default=10.0, help='Duração de cada rodada (s)')
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Página autenticada a ser medida (pode repetir; padrão: / e /paineis/)',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/', '/paineis/']
+        results = {}
+        with benchmark_user(BENCH_USERNAME) as (_, password):
+            for label, app, worker_class in MODES:
+                with gunicorn_server(
+                    options['port'], workers=options['workers'], app=app, worker_class=worker_class,
+                ) as base_url:
+                    clients = [HttpClient(base_url) for _ in range(options['concurrency'])]
+                    for client in clients:
+                        if not client.login(BENCH_USERNAME, password):
+                            raise CommandError('Falha ao autenticar o usuário de benchmark')
+                    for path in paths:
+                        result = run_load(clients, path, options['duration'])
+                        results[label, path] = result
+                        self.stdout.write(
+                            f'{label} {path:<12} {result["rps"]:8.1f} req/s | '
+                            f'p50 {result["p50"]:6.1f} ms | p95 {result["p95"]:6.1f} ms | '
+                            f'p99 {result["p99"]:6.1f} ms | erros {result["errors"]}'
+                        )
+
+        for path in paths:
+            wsgi, asgi = results['WSGI', path], results['ASGI', path]
+            if wsgi['p95']:
+                change = (asgi['p95'] / wsgi['p95'] - 1) * 100
+                self.stdout.write(self.style.SUCCESS(f'{path}: variação do p95 (ASGI x WSGI) {change:+.1f}%'))
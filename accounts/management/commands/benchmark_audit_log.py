@@ -0,0 +1,56 @@
+"""
+Command para comparar a gravação síncrona e em lote dos logs de auditoria.
+
+Sobe o Gunicorn (3 workers sync, sem reciclagem) duas vezes, uma com
+AUDIT_LOG_BUFFER=False e outra com AUDIT_LOG_BUFFER=True, e mede
+requisições/segundo em uma página autenticada (que registra um VIEW).
+
+Uso:
+    python manage.py benchmark_audit_log
+    python manage.py benchmark_audit_log --concurrency 24 --duration 30 --path /paineis/
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmark import HttpClient, benchmark_user, gunicorn_server, run_load
+from accounts.models import AuditLog
+
+BENCH_USERNAME = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Compara requisições/segundo com gravação de auditoria síncrona e em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099, help='Porta local do Gunicorn')
+        parser.add_argument('--workers', type=int, default=3, help='Nº de workers do Gunicorn')
+        parser.add_argument('--concurrency', type=int, default=12, help='Clientes simultâneos')
+        parser.add_argument('--duration', type=float, default=15.0, help='Duração de cada rodada (s)')
+        parser.add_argument('--path', default='/', help='Página autenticada a ser medida')
+
+    def handle(self, *args, **options):
+        results = {}
+        with benchmark_user(BENCH_USERNAME) as (_, password):
+            for label, buffer_enabled in (('síncrono', 'False'), ('em lote', 'True')):
+                rows_before = AuditLog.objects.count()
+                env = {'AUDIT_LOG_BUFFER': buffer_enabled}
+                with gunicorn_server(options['port'], workers=options['workers'], env=env) as base_url:
+                    clients = [HttpClient(base_url) for _ in range(options['concurrency'])]
+                    for client in clients:
+                        if not client.login(BENCH_USERNAME, password):
+                            raise CommandError('Falha ao autenticar o usuário de benchmark')
+                    result = run_load(clients, options['path'], options['duration'])
+                # O encerramento do Gunicorn grava o que restou no buffer
+                result['rows'] = AuditLog.objects.count() - rows_before
+                results[label] = result
+
+                self.stdout.write(
+                    f'{label:>9}: {result["rps"]:8.1f} req/s | '
+                    f'p50 {result["p50"]:6.1f} ms | p95 {result["p95"]:6.1f} ms | '
+                    f'erros {result["errors"]} | logs gravados {result["rows"]}'
+                )
+
+        before, after = results['síncrono'], results['em lote']
+        if before['rps']:
+            gain = (after['rps'] / before['rps'] - 1) * 100
+            self.stdout.write(self.style.SUCCESS(f'Variação de throughput: {gain:+.1f}%'))
@@ -0,0 +1,166 @@
+"""
+Command para medir o custo de um ataque de força bruta ao login.
+
+Sobe o Gunicorn duas vezes, com LOGIN_THROTTLE=False e LOGIN_THROTTLE=True,
+e dispara tentativas de login com senha errada a uma taxa fixa, a partir de
+um único IP, alternando entre um usuário real e nomes inexistentes (como em
+um credential stuffing). A cada segundo é medido o uso de CPU do Gunicorn
+(master + workers); ao final são informados o CPU por tentativa, as
+respostas 429 e os logs de auditoria gravados.
+
+Com o limite ligado, o CPU deve subir só nas primeiras tentativas (até o
+limite por IP) e ficar estável depois, por mais que o ataque continue.
+
+Uso:
+    python manage.py benchmark_login
+    python manage.py benchmark_login --rate 50 --duration 30
+"""
+
+import secrets
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmark import HttpClient, gunicorn_server, process_tree_cpu_seconds
+from accounts.models import AuditLog
+
+BENCH_USERNAME = 'benchmark_login'
+
+
+def run_attack(clients, usernames, rate, duration, pid):
+    """
+    Envia tentativas de login a `rate` por segundo (divididas entre os
+    clientes) durante `duration` segundos.
+
+    Returns:
+        dict: statuses (Counter), latencies (ms), cpu (CPU% por segundo),
+            cpu_seconds (total)
+    """
+    statuses = Counter()
+    latencies = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + duration
+    interval = len(clients) / rate
+
+    def worker(index, client):
+        attempt = index
+        next_at = started + index * interval / len(clients)
+        while True:
+            now = time.monotonic()
+            if next_at > now:
+                time.sleep(next_at - now)
+            if next_at >= deadline:
+                break
+            username = usernames[attempt % len(usernames)]
+            request_started = time.perf_counter()
+            try:
+                status = client.post('/login/', {'username': username, 'password': 'senha-errada'})[0]
+            except OSError:
+                status = None
+            elapsed = (time.perf_counter() - request_started) * 1000
+            with lock:
+                statuses[status] += 1
+                latencies.append(elapsed)
+            attempt += len(clients)
+            # Sem acumular atraso: se a resposta demorou, segue na próxima vaga
+            next_at = max(next_at + interval, time.monotonic())
+
+    threads = [threading.Thread(target=worker, args=(index, client)) for index, client in enumerate(clients)]
+    cpu_start = previous = process_tree_cpu_seconds(pid)
+    for thread in threads:
+        thread.start()
+    cpu = []
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1)
+        current = process_tree_cpu_seconds(pid)
+        cpu.append((current - previous) * 100)
+        previous = current
+    for thread in threads:
+        thread.join()
+
+    return {
+        'statuses': statuses,
+        'latencies': latencies,
+        'cpu': cpu,
+        'cpu_seconds': previous - cpu_start,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Mede o CPU do servidor sob ataque de força bruta ao login, com e sem o limite de tentativas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8096, help='Porta local do Gunicorn')
+        parser.add_argument('--workers', type=int, default=3, help='Nº de workers do Gunicorn')
+        parser.add_argument('--concurrency', type=int, default=12, help='Clientes simultâneos')
+        parser.add_argument('--rate', type=float, default=30.0, help='Tentativas por segundo')
+        parser.add_argument('--duration', type=float, default=20.0, help='Duração de cada rodada (s)')
+        parser.add_argument('--usernames', type=int, default=50,
+                            help='Nº de nomes tentados (1 real + inexistentes)')
+
+    def handle(self, *args, **options):
+        if options['rate'] <= 0 or options['concurrency'] < 1:
+            raise CommandError('--rate e --concurrency devem ser positivos')
+
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        user.set_password(secrets.token_urlsafe(16))
+        user.save()
+        usernames = [BENCH_USERNAME] + [f'{BENCH_USERNAME}_{i:03d}' for i in range(options['usernames'] - 1)]
+
+        results = {}
+        for label, throttle in (('sem limite', 'False'), ('com limite', 'True')):
+            rows_before = AuditLog.objects.count()
+            with tempfile.TemporaryDirectory() as tmp:
+                pid_file = Path(tmp) / 'gunicorn.pid'
+                env = {
+                    'LOGIN_THROTTLE': throttle,
+                    # Cache novo a cada rodada: nenhum contador sobra da anterior
+                    'DJANGO_CACHE_LOCATION': str(Path(tmp) / 'cache'),
+                    'LOGIN_THROTTLE_CACHE_LOCATION': str(Path(tmp) / 'login_throttle'),
+                    'METRICS_ENABLED': 'False',
+                }
+                with gunicorn_server(options['port'], workers=options['workers'], env=env,
+                                     extra_args=['--pid', str(pid_file)]) as base_url:
+                    pid = int(pid_file.read_text())
+                    clients = [HttpClient(base_url) for _ in range(options['concurrency'])]
+                    for client in clients:
+                        client.get('/login/')
+                    result = run_attack(clients, usernames, options['rate'], options['duration'], pid)
+            result['rows'] = AuditLog.objects.count() - rows_before
+            results[label] = result
+            self.report(label, result)
+
+        user.set_unusable_password()
+        user.save()
+
+        before, after = results['sem limite'], results['com limite']
+        if before['cpu_seconds']:
+            change = (after['cpu_seconds'] / before['cpu_seconds'] - 1) * 100
+            self.stdout.write(self.style.SUCCESS(f'Variação do CPU total do servidor: {change:+.1f}%'))
+
+    def report(self, label, result):
+        attempts = sum(result['statuses'].values())
+        cpu = result['cpu']
+        half = len(cpu) // 2
+        statuses = ', '.join(f'{status}: {count}' for status, count in sorted(
+            result['statuses'].items(), key=lambda item: str(item[0])
+        ))
+        self.stdout.write(
+            f'{label:>10}: {attempts} tentativas ({statuses}) | '
+            f'p50 {statistics.median(result["latencies"]) if attempts else 0:7.1f} ms | '
+            f'CPU {result["cpu_seconds"] * 1000 / max(attempts, 1):6.1f} ms/tentativa | '
+            f'logs gravados {result["rows"]}'
+        )
+        if half:
+            self.stdout.write(
+                f'{"":>10}  CPU% 1ª metade {statistics.mean(cpu[:half]):5.1f} | '
+                f'2ª metade {statistics.mean(cpu[half:]):5.1f} | '
+                f'por segundo: {" ".join(f"{value:.0f}" for value in cpu)}'
+            )
@@ -0,0 +1,299 @@
+"""
+Command de benchmark das views do app accounts, com baseline e detecção de
+regressões.
+
+Mede o fluxo de login, a home, /paineis/ (com e sem painel_id) e
+/gestao/logs/ (sem filtro e com cada filtro) de duas formas:
+    client: Client de testes do Django no próprio processo, em sequência;
+            informa também o nº de consultas por requisição
+    http:   Gunicorn (workers sync) em um subprocesso e clientes HTTP em
+            várias threads
+
+Para cada cenário informa p50/p95/p99, requisições/segundo e, por modo, o
+pico de memória residente. Os resultados são gravados em JSON com --save;
+sem --save, são comparados com o baseline e o comando falha (código 1)
+quando o p95, as consultas por requisição ou o pico de memória pioram além
+da tolerância.
+
+Usa o banco configurado (rode em uma cópia ou no banco gerado pelo seed):
+inclui o usuário "benchmark_views" no grupo Gestão com uma senha aleatória;
+ao final a senha é invalidada e o usuário sai do grupo. Os logs de
+auditoria das páginas ficam gravados.
+
+Uso:
+    python manage.py benchmark_views --save
+    python manage.py benchmark_views
+    python manage.py benchmark_views --mode client --scenario paineis --scenario audit_logs_q
+    python manage.py benchmark_views --mode http --concurrency 16 --tolerance 0.15
+"""
+
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from accounts.audit_buffer import flush_audit_buffer, wait_audit_tasks
+from accounts.benchmark import HttpClient, benchmark_user, gunicorn_server, peak_rss_kb, percentile, run_load
+from accounts.metrics import RequestMetrics, registry
+from accounts.models import AuditLog, PainelBI
+from accounts.permissions import GESTAO_GROUP
+
+BENCH_USERNAME = 'benchmark_views'
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+LOGIN_SCENARIO = 'login'
+HTTP_WARMUP_SECONDS = 1.0
+
+
+def build_scenarios(painel_id=None):
+    """
+    Cenários medidos: nome -> caminho (None = fluxo de login).
+    O cenário com painel_id só existe se houver um painel ativo.
+    """
+    today = timezone.localdate()
+    scenarios = {
+        LOGIN_SCENARIO: None,
+        'home': '/',
+        'paineis': '/paineis/',
+    }
+    if painel_id is not None:
+        scenarios['paineis_detalhe'] = f'/paineis/{painel_id}/'
+    scenarios.update({
+        'audit_logs': '/gestao/logs/',
+        'audit_logs_action': '/gestao/logs/?action=VIEW',
+        'audit_logs_user': f'/gestao/logs/?user={BENCH_USERNAME}',
+        'audit_logs_q': '/gestao/logs/?q=painel',
+        'audit_logs_period': '/gestao/logs/?period=7d',
+        'audit_logs_range': (
+            f'/gestao/logs/?from={(today - timedelta(days=3)).isoformat()}&to={today.isoformat()}'
+        ),
+        'audit_logs_date': f'/gestao/logs/?date={today.isoformat()}',
+    })
+    return scenarios
+
+
+def summarize(latencies, elapsed, errors, queries=None):
+    """Resumo de um cenário (latências em ms)"""
+    result = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+    }
+    if queries is not None:
+        result['queries'] = statistics.mean(queries) if queries else 0.0
+    return result
+
+
+def compare_results(baseline, current, tolerance, min_delta_ms):
+    """
+    Compara uma execução com o baseline.
+
+    Regressões:
+        p95 acima de baseline * (1 + tolerance) e mais de min_delta_ms maior
+        consultas por requisição acima do baseline (o nº é determinístico)
+        pico de memória acima de baseline * (1 + tolerance)
+
+    Returns:
+        list: Descrição de cada regressão encontrada
+    """
+    regressions = []
+    for mode, scenarios in current['results'].items():
+        for name, result in scenarios.items():
+            before = baseline.get('results', {}).get(mode, {}).get(name)
+            if not before:
+                continue
+            if (result['p95'] > before['p95'] * (1 + tolerance)
+                    and result['p95'] - before['p95'] > min_delta_ms):
+                regressions.append(
+                    f'{mode}/{name}: p95 {before["p95"]:.1f} -> {result["p95"]:.1f} ms'
+                )
+            if 'queries' in result and 'queries' in before and result['queries'] > before['queries'] + 1e-9:
+                regressions.append(
+                    f'{mode}/{name}: consultas/req {before["queries"]:.1f} -> {result["queries"]:.1f}'
+                )
+    for mode, rss in current.get('peak_rss_kb', {}).items():
+        before = baseline.get('peak_rss_kb', {}).get(mode)
+        if before and rss > before * (1 + tolerance):
+            regressions.append(f'{mode}: pico de memória {before / 1024:.0f} -> {rss / 1024:.0f} MiB')
+    return regressions
+
+
+def dataset_info():
+    """Volume de dados da execução (baselines só são comparáveis com volumes próximos)"""
+    return {
+        'audit_logs': AuditLog.objects.count(),
+        'paineis': PainelBI.objects.count(),
+        'users': User.objects.count(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark das views (test client e HTTP) com baseline em JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=('client', 'http', 'both'), default='both')
+        parser.add_argument(
+            '--scenario', action='append', default=[], metavar='NOME',
+            help='Mede apenas este cenário (pode repetir)',
+        )
+        parser.add_argument('--iterations', type=int, default=30, help='Requisições por cenário (client)')
+        parser.add_argument('--warmup', type=int, default=3, help='Requisições descartadas por cenário')
+        parser.add_argument('--port', type=int, default=8097, help='Porta local do Gunicorn (http)')
+        parser.add_argument('--workers', type=int, default=3, help='Nº de workers do Gunicorn (http)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Clientes simultâneos (http)')
+        parser.add_argument('--duration', type=float, default=5.0, help='Duração de cada cenário (http, s)')
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Arquivo JSON do baseline')
+        parser.add_argument('--save', action='store_true', help='Grava esta execução como baseline')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Piora relativa tolerada (0.25 = 25%%)')
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=5.0,
+            help='Diferença mínima de p95 (ms) para contar como regressão',
+        )
+
+    def handle(self, *args, **options):
+        # Grupo Gestão: acesso a todas as páginas medidas
+        with benchmark_user(BENCH_USERNAME, groups=[GESTAO_GROUP]) as (_, password):
+            run = self.run_benchmarks(password, options)
+
+        baseline_path = options['baseline']
+        if options['save']:
+            baseline_path.write_text(json.dumps(run, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'✓ Baseline gravado em {baseline_path}'))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f'Sem baseline em {baseline_path}; use --save'))
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        if baseline.get('dataset') != run['dataset']:
+            self.stdout.write(self.style.WARNING(
+                f'Volume de dados diferente do baseline: {baseline.get("dataset")} x {run["dataset"]}'
+            ))
+        regressions = compare_results(baseline, run, options['tolerance'], options['min_delta_ms'])
+        if regressions:
+            raise CommandError('Regressões em relação ao baseline:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('✓ Nenhuma regressão em relação ao baseline'))
+
+    def run_benchmarks(self, password, options):
+        """Executa os cenários nos modos pedidos e monta o resultado"""
+        painel_id = (
+            PainelBI.objects.filter(ativo=True).order_by('pk').values_list('pk', flat=True).first()
+        )
+        scenarios = build_scenarios(painel_id)
+        if options['scenario']:
+            unknown = set(options['scenario']) - set(scenarios)
+            if unknown:
+                raise CommandError(f'Cenários desconhecidos: {", ".join(sorted(unknown))}')
+            scenarios = {name: path for name, path in scenarios.items() if name in options['scenario']}
+        if painel_id is None:
+            self.stdout.write(self.style.WARNING('Nenhum painel ativo: cenário paineis_detalhe ignorado'))
+
+        run = {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'dataset': dataset_info(),
+            'results': {},
+            'peak_rss_kb': {},
+        }
+        # As métricas do benchmark (/metrics) não se misturam às do servidor
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            if options['mode'] in ('client', 'both'):
+                with override_settings(METRICS=dict(settings.METRICS, DIR=Path(metrics_dir))):
+                    run['results']['client'] = self.run_client(scenarios, password, options)
+                    registry.retire()
+                run['peak_rss_kb']['client'] = peak_rss_kb()
+                self.report('client', run['results']['client'], run['peak_rss_kb']['client'])
+            if options['mode'] in ('http', 'both'):
+                run['results']['http'] = self.run_http(scenarios, password, metrics_dir, options)
+                run['peak_rss_kb']['http'] = peak_rss_kb(children=True)
+                self.report('http', run['results']['http'], run['peak_rss_kb']['http'])
+        return run
+
+    def run_client(self, scenarios, password, options):
+        """Cenários pelo Client de testes, em sequência, contando as consultas"""
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*',) and not h.startswith('.')), 'localhost')
+        client = Client(SERVER_NAME=host)
+        client.force_login(User.objects.get(username=BENCH_USERNAME))
+        credentials = {'username': BENCH_USERNAME, 'password': password}
+
+        def login_flow():
+            anonymous = Client(SERVER_NAME=host)
+            anonymous.get('/login/')
+            return anonymous.post('/login/', credentials).status_code == 302
+
+        results = {}
+        for name, path in scenarios.items():
+            latencies, queries, errors = [], [], 0
+            for iteration in range(options['warmup'] + options['iterations']):
+                counter = RequestMetrics()
+                started = time.perf_counter()
+                with connection.execute_wrapper(counter.db_wrapper):
+                    ok = login_flow() if path is None else client.get(path).status_code == 200
+                elapsed = (time.perf_counter() - started) * 1000
+                if iteration < options['warmup']:
+                    continue
+                latencies.append(elapsed)
+                queries.append(counter.db_queries)
+                errors += not ok
+            results[name] = summarize(latencies, sum(latencies) / 1000, errors, queries)
+        # Logs de auditoria agendados pelas views vão para o banco antes do modo http
+        wait_audit_tasks()
+        flush_audit_buffer()
+        return results
+
+    def run_http(self, scenarios, password, metrics_dir, options):
+        """Cenários pelo Gunicorn, com clientes HTTP em várias threads"""
+        env = {'METRICS_DIR': metrics_dir}
+        results = {}
+        with gunicorn_server(options['port'], workers=options['workers'], env=env) as base_url:
+            clients = [HttpClient(base_url) for _ in range(options['concurrency'])]
+            for client in clients:
+                if not client.login(BENCH_USERNAME, password):
+                    raise CommandError('Falha ao autenticar o usuário de benchmark')
+
+            def login_flow(client):
+                anonymous = HttpClient(base_url)
+                anonymous.get('/login/')
+                status, _ = anonymous.post('/login/', {'username': BENCH_USERNAME, 'password': password})
+                return 200 if status == 302 else status
+
+            for name, path in scenarios.items():
+                request = login_flow if path is None else None
+                if options['warmup']:
+                    run_load(clients, path, HTTP_WARMUP_SECONDS, request=request)
+                result = run_load(clients, path, options['duration'], request=request)
+                results[name] = {
+                    key: result[key] for key in ('requests', 'errors', 'rps', 'p50', 'p95', 'p99')
+                }
+        return results
+
+    def report(self, mode, results, rss_kb):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Modo {mode}'))
+        self.stdout.write(
+            f'{"cenário":<20} {"req":>6} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"consultas":>10} {"erros":>6}'
+        )
+        for name, result in results.items():
+            queries = f'{result["queries"]:.1f}' if 'queries' in result else '-'
+            self.stdout.write(
+                f'{name:<20} {result["requests"]:>6} {result["rps"]:>8.1f} '
+                f'{result["p50"]:>7.1f}ms {result["p95"]:>7.1f}ms {result["p99"]:>7.1f}ms '
+                f'{queries:>10} {result["errors"]:>6}'
+            )
+        self.stdout.write(f'Pico de memória: {rss_kb / 1024:.0f} MiB')
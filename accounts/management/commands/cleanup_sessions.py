@@ -0,0 +1,53 @@
+"""
+Command para remover sessões expiradas da tabela django_session em lotes.
+
+Diferente do clearsessions do Django (um único DELETE), remove no máximo
+--batch-size linhas por transação, com uma pausa opcional entre os lotes,
+para não segurar o lock de escrita do SQLite durante o horário de uso.
+
+Uso:
+    python manage.py cleanup_sessions
+    python manage.py cleanup_sessions --batch-size 500 --sleep 0.05
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = 'Remove sessões expiradas em lotes curtos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessões removidas por transação')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Pausa entre lotes (segundos)')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            self.stdout.write(self.style.WARNING(
+                f'○ SESSION_ENGINE "{settings.SESSION_ENGINE}" não grava sessões no banco'
+            ))
+            return
+
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        started = time.perf_counter()
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'✓ {deleted} sessões expiradas removidas em {elapsed:.2f}s'))
@@ -0,0 +1,98 @@
+"""
+Command para medir o tempo de inicialização do container (time-to-first-200).
+
+Executa o entrypoint.sh (ou outro comando) como um processo novo, da mesma
+forma que o container, e mede o tempo até a primeira resposta 200 em
+/login/. Repete a medição algumas vezes e informa o menor valor e a mediana.
+
+Uso:
+    python manage.py measure_startup
+    python manage.py measure_startup --runs 5 --env DJANGO_MIGRATE=never
+    python manage.py measure_startup --command "gunicorn --config gunicorn.conf.py"
+"""
+
+import os
+import shlex
+import signal
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def time_to_first_200(command, url, env, timeout):
+    """
+    Inicia o processo e aguarda a primeira resposta 200.
+
+    Returns:
+        float: Segundos desde o início do processo
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'O processo terminou com código {process.returncode}')
+            try:
+                with urllib.request.urlopen(url, timeout=2) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.02)
+        raise CommandError(f'Sem resposta 200 em {timeout}s')
+    finally:
+        # Encerra o Gunicorn e os workers (mesmo grupo de processos)
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=30)
+        except ProcessLookupError:
+            pass
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo até a primeira resposta 200 de um processo recém-iniciado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8098, help='Porta local')
+        parser.add_argument('--runs', type=int, default=3, help='Nº de medições')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Tempo máximo por medição (s)')
+        parser.add_argument(
+            '--command', default='sh entrypoint.sh',
+            help='Comando de inicialização (padrão: o entrypoint do container)',
+        )
+        parser.add_argument(
+            '--env', action='append', default=[], metavar='NOME=VALOR',
+            help='Variável de ambiente adicional (pode repetir)',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env['GUNICORN_BIND'] = f'127.0.0.1:{options["port"]}'
+        for item in options['env']:
+            name, _, value = item.partition('=')
+            env[name] = value
+        command = shlex.split(options['command'])
+        url = f'http://127.0.0.1:{options["port"]}/login/'
+
+        timings = []
+        for run in range(1, options['runs'] + 1):
+            elapsed = time_to_first_200(command, url, env, options['timeout'])
+            timings.append(elapsed)
+            self.stdout.write(f'Execução {run}: {elapsed:.2f}s até o primeiro 200')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["command"]}: mínimo {min(timings):.2f}s | '
+            f'mediana {statistics.median(timings):.2f}s'
+        ))
@@ -0,0 +1,78 @@
+"""
+Command para recalcular a tabela agregada de auditoria (AuditLogStats).
+
+Útil para preencher a tabela a partir dos logs já existentes (backfill) ou
+corrigir divergências. Recalcula todos os dias ou apenas a partir de uma data.
+
+Os dias anteriores ao log mais antigo (já arquivados por archive_audit_logs)
+não são tocados: suas estatísticas são o único registro que restou deles. O
+dia do log mais antigo é recalculado com os logs que restaram; se ele foi
+arquivado pela metade, use --since com o dia seguinte.
+
+Uso:
+    python manage.py rebuild_audit_stats
+    python manage.py rebuild_audit_stats --since 2026-01-01
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import IntegerField, Sum
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.utils import timezone
+
+from accounts.models import AuditLog, AuditLogStats
+from accounts.time_range import local_midnight
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as estatísticas agregadas dos logs de auditoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Recalcula apenas a partir desta data (AAAA-MM-DD)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Data inválida. Use o formato AAAA-MM-DD.')
+
+        earliest = AuditLog.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if earliest is None:
+            self.stdout.write('Nenhum log de auditoria; estatísticas mantidas.')
+            return
+        since = max(filter(None, (since, timezone.localdate(earliest))))
+
+        # Intervalo sobre a coluna (usa o índice de timestamp, ao contrário de __date)
+        logs = AuditLog.objects.filter(timestamp__gte=local_midnight(since))
+        stats = AuditLogStats.objects.filter(dia__gte=since)
+
+        # Dia calculado no fuso horário configurado (TIME_ZONE); logs agrupados
+        # ou amostrados contam extra_data['occurrences'] eventos
+        occurrences = Coalesce(Cast(KT('extra_data__occurrences'), IntegerField()), 1)
+        rows = (
+            logs.order_by()
+            .annotate(dia=TruncDate('timestamp'))
+            .values('dia', 'action', 'severity')
+            .annotate(total=Sum(occurrences))
+        )
+
+        with transaction.atomic():
+            removed, _ = stats.delete()
+            created = AuditLogStats.objects.bulk_create(
+                [AuditLogStats(**row) for row in rows.iterator()],
+                batch_size=1000,
+            )
+
+        total = sum(item.total for item in created)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(created)} linhas agregadas recalculadas desde {since:%d/%m/%Y} '
+            f'({total} eventos, {removed} linhas anteriores removidas)'
+        ))
@@ -0,0 +1,156 @@
+"""
+Command que reaplica um dia de logs de auditoria à política de volume
+(amostragem e agrupamento de accounts/audit_utils.py) e informa quantas
+gravações ela teria evitado. Nada é gravado no banco.
+
+Os logs do dia são lidos em ordem cronológica e distribuídos ao acaso entre
+--workers processos simulados (cada worker do Gunicorn tem as próprias
+janelas de agrupamento). As janelas vencidas são fechadas a cada
+FLUSH_INTERVAL, como faz a thread do buffer. O relatório compara, por ação,
+os INSERTs originais com os INSERTs e UPDATEs da política e confere que o
+total de eventos representados (occurrences) se mantém.
+
+Logs que já agrupam ocorrências (gravados com a política ligada) entram
+como um evento só; use um dia gravado sem a política (ou do seed_data).
+
+Uso:
+    python manage.py replay_audit_day --date 2026-10-17
+    python manage.py replay_audit_day --window 300 --sample VIEW=0.5
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.audit_buffer import AuditCoalescer, get_config
+from accounts.audit_utils import coalesce_key, is_coalesced, sample_weight
+from accounts.models import AuditLog
+from accounts.time_range import local_midnight
+
+REPLAY_FIELDS = ('id', 'user_id', 'username', 'action', 'severity', 'ip_address', 'path', 'timestamp')
+
+
+def parse_sample_rates(values):
+    """Converte ["VIEW=0.5", ...] em {'VIEW': 0.5}"""
+    rates = {}
+    for value in values:
+        action, _, rate = value.partition('=')
+        try:
+            rates[action.strip()] = float(rate)
+        except ValueError:
+            raise CommandError(f'Amostragem inválida: {value!r} (use AÇÃO=fração, ex.: VIEW=0.5)')
+    return rates
+
+
+def replay(logs, config, workers=1, seed=0):
+    """
+    Reaplica os logs (em ordem cronológica) à política de volume.
+
+    Returns:
+        dict: Por ação, Counters com original, inserts, updates, sampled_out
+            e events (eventos representados pelos logs mantidos)
+    """
+    rng = random.Random(seed)
+    coalescers = [AuditCoalescer() for _ in range(workers)]
+    totals = {key: Counter() for key in ('original', 'inserts', 'updates', 'sampled_out', 'events')}
+    flush_interval = timedelta(seconds=config['FLUSH_INTERVAL'])
+    next_tick = None
+
+    def close(now, force=False):
+        for coalescer in coalescers:
+            for window in coalescer.expire(now, force=force):
+                totals['updates'][window.entry.action] += 1
+                totals['events'][window.entry.action] += window.occurrences - window.initial
+
+    for entry in logs:
+        action = entry.action
+        totals['original'][action] += 1
+        if next_tick is None or entry.timestamp >= next_tick:
+            close(entry.timestamp)
+            next_tick = entry.timestamp + flush_interval
+
+        weight = sample_weight(action, rng=rng, config=config)
+        if not weight:
+            totals['sampled_out'][action] += 1
+            continue
+        coalescer = coalescers[rng.randrange(workers)]
+        if entry.path and is_coalesced(action, config):
+            if coalescer.offer(coalesce_key(entry), entry, weight, config=config):
+                continue
+        totals['inserts'][action] += 1
+        totals['events'][action] += weight
+
+    close(None, force=True)
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Mostra a redução de gravações de auditoria da política de agrupamento/amostragem em um dia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Dia reaplicado (AAAA-MM-DD); padrão: o dia mais recente com logs')
+        parser.add_argument('--window', type=int, help='Janela de agrupamento (segundos); padrão: COALESCE_WINDOW')
+        parser.add_argument('--actions', help='Ações agrupadas, separadas por vírgula; padrão: COALESCE_ACTIONS')
+        parser.add_argument('--sample', action='append', default=None, metavar='AÇÃO=FRAÇÃO',
+                            help='Amostragem por ação (pode repetir); padrão: SAMPLE_RATES')
+        parser.add_argument('--workers', type=int, default=3, help='Workers simulados')
+        parser.add_argument('--seed', type=int, default=0, help='Semente da amostragem/distribuição')
+
+    def handle(self, *args, **options):
+        config = get_config()
+        config['ENABLED'] = True
+        if options['window'] is not None:
+            config['COALESCE_WINDOW'] = options['window']
+        if options['actions'] is not None:
+            config['COALESCE_ACTIONS'] = [a.strip() for a in options['actions'].split(',') if a.strip()]
+        if options['sample'] is not None:
+            config['SAMPLE_RATES'] = parse_sample_rates(options['sample'])
+        if options['workers'] < 1:
+            raise CommandError('--workers deve ser positivo')
+
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Data inválida. Use o formato AAAA-MM-DD.')
+        else:
+            latest = AuditLog.objects.order_by('-timestamp').values_list('timestamp', flat=True).first()
+            if latest is None:
+                raise CommandError('Não há logs de auditoria para reaplicar.')
+            day = timezone.localdate(latest)
+
+        logs = (
+            AuditLog.objects
+            .filter(timestamp__gte=local_midnight(day), timestamp__lt=local_midnight(day + timedelta(days=1)))
+            .order_by('timestamp', 'id')
+            .only(*REPLAY_FIELDS)
+            .iterator(chunk_size=5000)
+        )
+        totals = replay(logs, config, workers=options['workers'], seed=options['seed'])
+        self.report(day, config, options['workers'], totals)
+
+    def report(self, day, config, workers, totals):
+        original = sum(totals['original'].values())
+        if not original:
+            raise CommandError(f'Nenhum log em {day:%d/%m/%Y}.')
+
+        rates = ', '.join(f'{a}={r}' for a, r in config['SAMPLE_RATES'].items()) or 'nenhuma'
+        self.stdout.write(
+            f'Dia {day:%d/%m/%Y} | janela {config["COALESCE_WINDOW"]}s | '
+            f'agrupadas: {", ".join(config["COALESCE_ACTIONS"]) or "nenhuma"} | '
+            f'amostragem: {rates} | {workers} worker(s)'
+        )
+        self.stdout.write(f'{"ação":<14}{"original":>10}{"inserts":>10}{"updates":>10}{"redução":>10}{"eventos":>10}')
+        for action in sorted(totals['original'], key=lambda a: -totals['original'][a]):
+            self.write_row(action, *(totals[key][action] for key in ('original', 'inserts', 'updates', 'events')))
+        self.write_row(
+            'total', original, sum(totals['inserts'].values()), sum(totals['updates'].values()),
+            sum(totals['events'].values()),
+        )
+
+    def write_row(self, label, original, inserts, updates, events):
+        reduction = (1 - (inserts + updates) / original) * 100 if original else 0.0
+        self.stdout.write(f'{label:<14}{original:>10,}{inserts:>10,}{updates:>10,}{reduction:>9.1f}%{events:>10,}')
@@ -0,0 +1,509 @@
+"""
+Command que gera dados sintéticos em volume de produção: catálogo de
+painéis, usuários distribuídos em grupos e histórico de auditoria.
+
+A geração é determinística: a mesma --seed (e a mesma --end-date) produz os
+mesmos registros. Os logs de auditoria seguem o movimento de um dia útil
+(pico às 10h e às 14h, pouco movimento à noite e nos fins de semana), a
+proporção de ações do sistema (VIEW predomina) e as severidades usadas em
+accounts/audit_utils.py; poucos usuários concentram a maior parte dos acessos.
+
+Desempenho:
+    - catálogo, usuários e grupos: bulk_create em lotes
+    - senhas: um único hash calculado antes (todos os usuários usam --password)
+    - logs: blocos gerados (opcionalmente por um pool de processos, com
+      --processes) e gravados por um único escritor, com executemany do
+      mesmo INSERT que o bulk_create emitiria, uma transação por bloco
+    - SQLite: os índices e o gatilho da busca textual (FTS5) de
+      accounts_auditlog são removidos durante a carga e recriados no final
+      (--keep-indexes mantém os índices durante a carga)
+    - AuditLogStats é preenchida com os totais calculados na geração
+
+Vazão medida dos logs: cerca de 70 mil linhas/s no SQLite (1 vCPU), abaixo
+da meta de 100 mil/s; o gargalo é o próprio INSERT do escritor único.
+
+Use um banco novo (ex.: DATABASE_URL=sqlite:////tmp/seed.sqlite3 após o
+migrate): o comando recusa um banco que já tenha usuários, painéis ou logs
+(a carga remove os índices e o gatilho da busca de accounts_auditlog) a
+menos que --force seja informado, e recusa sempre um banco que já tenha os
+usuários do seed. Os usuários gerados não têm senha utilizável, a menos que
+--password seja informado.
+
+Uso:
+    python manage.py seed_data
+    python manage.py seed_data --audit-logs 20000000 --processes 4
+    python manage.py seed_data --seed 7 --users 20000 --end-date 2026-06-30
+"""
+
+import multiprocessing
+import random
+import time
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+from itertools import accumulate, islice
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from accounts.audit_stats import add_audit_stats
+from accounts.menu import invalidate_menu_cache
+from accounts.models import AuditLog, CategoriaPainel, PainelBI
+from accounts.permissions import GESTAO_GROUP, bump_permissions_version
+
+SEED_PREFIX = 'seed_'
+
+# Colunas gravadas em accounts_auditlog, na ordem das tuplas geradas
+AUDIT_FIELDS = (
+    'user', 'username', 'action', 'description', 'severity',
+    'ip_address', 'user_agent', 'path', 'method', 'timestamp',
+)
+
+# Proporção das ações (VIEW domina o volume)
+ACTION_WEIGHTS = (
+    ('VIEW', 80.0), ('LOGIN', 8.0), ('LOGOUT', 6.0), ('ACCESS_DENIED', 2.0),
+    ('UPDATE', 1.5), ('CREATE', 1.0), ('ERROR', 1.0), ('DELETE', 0.5),
+)
+
+# Peso de cada hora local de um dia útil; fins de semana usam WEEKEND_FACTOR
+HOUR_WEIGHTS = (
+    1, 1, 1, 1, 1, 2, 4, 10, 30, 45, 50, 45,
+    30, 40, 50, 45, 35, 20, 8, 5, 3, 2, 1, 1,
+)
+WEEKEND_FACTOR = 0.15
+
+# Fração de logins com falha (WARNING) e de erros críticos
+LOGIN_FAILURE_RATE = 0.08
+CRITICAL_ERROR_RATE = 0.1
+
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:142.0) Gecko/20100101 Firefox/142.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_6) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.0 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0 Safari/537.36 Edg/140.0',
+)
+
+FIRST_NAMES = (
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique',
+    'Isabela', 'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Patrícia', 'Rafael',
+    'Sofia', 'Thiago', 'Vanessa', 'Wagner',
+)
+LAST_NAMES = (
+    'Almeida', 'Barbosa', 'Cardoso', 'Dias', 'Esteves', 'Ferreira', 'Gomes', 'Lima',
+    'Martins', 'Nascimento', 'Oliveira', 'Pereira', 'Ribeiro', 'Santos', 'Souza', 'Teixeira',
+)
+
+CATEGORY_NAMES = (
+    'Financeiro', 'Recursos Humanos', 'Vendas', 'Operações', 'Logística', 'Compras',
+    'Atendimento', 'Qualidade', 'Jurídico', 'Tecnologia', 'Marketing', 'Planejamento',
+)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Contexto da geração dos logs (definido no processo principal ou no
+# inicializador de cada processo do pool)
+_context = {}
+
+
+def init_worker(context):
+    """Inicializador dos processos do pool"""
+    global _context
+    _context = context
+
+
+def hour_weight(moment):
+    """Peso de uma hora local no movimento do sistema"""
+    weight = HOUR_WEIGHTS[moment.hour]
+    return weight * WEEKEND_FACTOR if moment.weekday() >= 5 else weight
+
+
+def plan_slots(start, end, total, tz):
+    """
+    Distribui `total` logs pelas horas de [start, end), proporcionalmente
+    ao peso de cada hora (maiores restos), sem sorteio.
+
+    Returns:
+        list: (início da hora em epoch, dia local, quantidade) das horas com logs
+    """
+    first = int(start.timestamp()) // 3600 * 3600
+    hours = range(first, int(end.timestamp()), 3600)
+    locals_ = [datetime.fromtimestamp(epoch, tz) for epoch in hours]
+    weights = [hour_weight(moment) for moment in locals_]
+    scale = total / sum(weights)
+    exact = [weight * scale for weight in weights]
+    counts = [int(value) for value in exact]
+    remainder = total - sum(counts)
+    by_fraction = sorted(range(len(exact)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in by_fraction[:remainder]:
+        counts[i] += 1
+    return [
+        (epoch, moment.date(), count)
+        for epoch, moment, count in zip(hours, locals_, counts) if count
+    ]
+
+
+def plan_chunks(slots, chunk_size):
+    """Agrupa horas consecutivas em blocos de aproximadamente chunk_size logs"""
+    chunks, current, size = [], [], 0
+    for slot in slots:
+        current.append(slot)
+        size += slot[2]
+        if size >= chunk_size:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+    return list(enumerate(chunks))
+
+
+def generate_chunk(task):
+    """
+    Gera os logs de um bloco de horas.
+
+    Args:
+        task: (índice do bloco, [(início da hora, dia local, quantidade), ...])
+
+    Returns:
+        tuple: (linhas prontas para o INSERT, Counter {(dia, ação, severidade): total})
+    """
+    index, slots = task
+    ctx = _context
+    rng = random.Random(f'{ctx["seed"]}:audit:{index}')
+    naive_utc = ctx['naive_utc']
+    users = ctx['users']
+    paineis = ctx['paineis']
+    actions, action_cum = ctx['actions'], ctx['action_cum']
+    user_ids, user_cum = ctx['user_indexes'], ctx['user_cum']
+    utc = ctx['utc']
+
+    rows = []
+    stats = Counter()
+    for epoch, dia, count in slots:
+        stamps = sorted(epoch + rng.random() * 3600 for _ in range(count))
+        picked_users = rng.choices(user_ids, cum_weights=user_cum, k=count)
+        picked_actions = rng.choices(actions, cum_weights=action_cum, k=count)
+        for stamp, user_index, action in zip(stamps, picked_users, picked_actions):
+            user_id, username, ip_address, user_agent = users[user_index]
+            severity = 'INFO'
+            method = 'GET'
+            if action == 'VIEW':
+                roll = rng.random()
+                if roll < 0.6:
+                    painel_id, titulo = rng.choice(paineis)
+                    description, path = f'Acessou a página: Painéis BI - {titulo}', f'/paineis/{painel_id}/'
+                elif roll < 0.85:
+                    description, path = 'Acessou a página: Home', '/'
+                elif roll < 0.95:
+                    description, path = 'Acessou a página: Logs de Auditoria', '/gestao/logs/'
+                else:
+                    description, path = 'Acessou a página: Dashboard de Gestão', '/gestao/dashboard/'
+            elif action == 'LOGIN':
+                path, method = '/login/', 'POST'
+                if rng.random() < LOGIN_FAILURE_RATE:
+                    description, severity = 'Tentativa de login falhou', 'WARNING'
+                else:
+                    description = 'Login realizado com sucesso'
+            elif action == 'LOGOUT':
+                description, path = 'Logout realizado', '/logout/'
+            elif action == 'ACCESS_DENIED':
+                description, path, severity = 'Acesso negado à página: /gestao/logs/', '/gestao/logs/', 'WARNING'
+            elif action == 'ERROR':
+                painel_id, titulo = rng.choice(paineis)
+                description, path = f'Erro: tempo limite ao carregar {titulo}', f'/paineis/{painel_id}/'
+                severity = 'CRITICAL' if rng.random() < CRITICAL_ERROR_RATE else 'ERROR'
+            else:
+                painel_id, titulo = rng.choice(paineis)
+                verb = {'CREATE': 'Criou', 'UPDATE': 'Atualizou', 'DELETE': 'Excluiu'}[action]
+                description = f'{verb} Painel BI: {titulo}'
+                path, method = f'/admin/accounts/painelbi/{painel_id}/change/', 'POST'
+                if action == 'DELETE':
+                    severity = 'WARNING'
+            if naive_utc:
+                # Mesmo formato de adapt_datetimefield_value do SQLite, sem o custo por linha
+                timestamp = str(EPOCH + timedelta(seconds=stamp))
+            else:
+                timestamp = datetime.fromtimestamp(stamp, utc)
+            rows.append((
+                user_id, username, action, description, severity,
+                ip_address, user_agent, path, method, timestamp,
+            ))
+            stats[(dia, action, severity)] += 1
+    return rows, stats
+
+
+def audit_insert_sql():
+    """INSERT de accounts_auditlog com as colunas de AUDIT_FIELDS"""
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(AuditLog._meta.get_field(name).column) for name in AUDIT_FIELDS)
+    placeholders = ', '.join(['%s'] * len(AUDIT_FIELDS))
+    return f'INSERT INTO {quote(AuditLog._meta.db_table)} ({columns}) VALUES ({placeholders})'
+
+
+def drop_sqlite_audit_indexes():
+    """
+    Remove os índices e o gatilho de inserção da busca textual de
+    accounts_auditlog (SQLite).
+
+    Returns:
+        list: Comandos SQL para recriá-los
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = %s "
+            "AND (type = 'index' OR (type = 'trigger' AND name LIKE '%%_fts_ai')) AND sql IS NOT NULL",
+            [AuditLog._meta.db_table],
+        )
+        objects = cursor.fetchall()
+        for kind, name, _ in objects:
+            cursor.execute(f'DROP {kind.upper()} {connection.ops.quote_name(name)}')
+    return [sql for _, _, sql in objects]
+
+
+def restore_sqlite_audit_indexes(statements):
+    """Recria os índices e o gatilho e reindexa a busca textual"""
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        if any('_fts_ai' in statement for statement in statements):
+            cursor.execute(
+                f"INSERT INTO {AuditLog._meta.db_table}_fts({AuditLog._meta.db_table}_fts) VALUES ('rebuild')"
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera catálogo, usuários e histórico de auditoria sintéticos (determinístico) em um banco '
+        'novo. Vazão dos logs: ~70 mil linhas/s no SQLite, abaixo da meta de 100 mil/s.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Semente da geração')
+        parser.add_argument('--categorias', type=int, default=40, help='Nº de categorias')
+        parser.add_argument('--paineis', type=int, default=400, help='Nº de painéis')
+        parser.add_argument('--groups', type=int, default=30, help='Nº de grupos (além de Gestão)')
+        parser.add_argument('--users', type=int, default=5000, help='Nº de usuários')
+        parser.add_argument('--audit-logs', type=int, default=1_000_000, help='Nº de logs de auditoria')
+        parser.add_argument('--days', type=int, default=365, help='Dias de histórico')
+        parser.add_argument(
+            '--end-date', type=date.fromisoformat, default=None,
+            help='Último dia do histórico, AAAA-MM-DD (padrão: hoje)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=50_000, help='Logs por bloco/transação')
+        parser.add_argument(
+            '--processes', type=int, default=0,
+            help='Processos geradores (0 = gera no próprio escritor)',
+        )
+        parser.add_argument(
+            '--password', default=None,
+            help='Senha de todos os usuários gerados (padrão: senha inutilizável)',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Gera os dados mesmo em um banco que já tenha usuários, painéis ou logs',
+        )
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='SQLite: mantém os índices de accounts_auditlog durante a carga',
+        )
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=SEED_PREFIX).exists():
+            raise CommandError('O banco já contém dados do seed; use um banco novo')
+        if not options['force'] and any(
+            model.objects.exists() for model in (User, AuditLog, PainelBI, CategoriaPainel)
+        ):
+            raise CommandError(
+                'O banco não está vazio (usuários, painéis ou logs); use um banco novo ou --force'
+            )
+
+        self.rng = random.Random(options['seed'])
+        self.timings = []
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            groups = self.timed('grupos', self.create_groups, options)
+            paineis = self.timed('catálogo', self.create_catalog, options, groups)
+            users = self.timed('usuários', self.create_users, options, groups)
+        invalidate_menu_cache()
+        bump_permissions_version()
+
+        if options['audit_logs']:
+            self.create_audit_logs(options, users, paineis)
+
+        for label, count, seconds in self.timings:
+            rate = f' ({count / seconds:,.0f}/s)' if seconds and count else ''
+            self.stdout.write(f'  {label:<22} {count:>12,} em {seconds:7.2f}s{rate}')
+        self.stdout.write(self.style.SUCCESS(f'✓ Concluído em {time.perf_counter() - started:.1f}s'))
+
+    def timed(self, label, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.timings.append((label, len(result), time.perf_counter() - started))
+        return result
+
+    def create_groups(self, options):
+        gestao, _ = Group.objects.get_or_create(name=GESTAO_GROUP)
+        names = [f'{SEED_PREFIX}grupo_{i:03d}' for i in range(1, options['groups'] + 1)]
+        Group.objects.bulk_create([Group(name=name) for name in names], ignore_conflicts=True)
+        return [gestao] + list(Group.objects.filter(name__in=names).order_by('name'))
+
+    def create_catalog(self, options, groups):
+        rng = self.rng
+        categorias = CategoriaPainel.objects.bulk_create([
+            CategoriaPainel(
+                nome=f'{CATEGORY_NAMES[i % len(CATEGORY_NAMES)].upper()} {i // len(CATEGORY_NAMES) + 1:02d}',
+                ordem=i,
+            )
+            for i in range(options['categorias'])
+        ], batch_size=1000)
+        access_groups = groups[1:] or groups
+        PainelBI.objects.bulk_create([
+            PainelBI(
+                categoria=categorias[i % len(categorias)],
+                grupo_acesso=None if rng.random() < 0.1 else rng.choice(access_groups),
+                titulo=f'Painel {i + 1:04d}',
+                descricao=f'Indicadores sintéticos {i + 1:04d}',
+                iframe_url=f'https://app.powerbi.com/view?r=seed{options["seed"]}-{i + 1:04d}',
+                ordem=i // len(categorias),
+                ativo=rng.random() >= 0.05,
+            )
+            for i in range(options['paineis'])
+        ], batch_size=1000)
+        return list(
+            PainelBI.objects.filter(iframe_url__contains=f'r=seed{options["seed"]}-')
+            .order_by('pk').values_list('pk', 'titulo')
+        )
+
+    def create_users(self, options, groups):
+        rng = self.rng
+        # Hash calculado uma vez (sal derivado da semente: mesma entrada, mesmo hash);
+        # sem --password, make_password(None) gera uma senha inutilizável
+        if options['password'] is None:
+            password = make_password(None)
+        else:
+            password = make_password(options['password'], salt=f'seed{options["seed"]}salt')
+        users = []
+        for i in range(1, options['users'] + 1):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            users.append(User(
+                username=f'{SEED_PREFIX}{i:06d}',
+                first_name=first,
+                last_name=last,
+                email=f'{SEED_PREFIX}{i:06d}@exemplo.gov.br',
+                password=password,
+            ))
+        User.objects.bulk_create(users, batch_size=1000)
+        ids = dict(
+            User.objects.filter(username__startswith=SEED_PREFIX).values_list('username', 'pk')
+        )
+
+        # 2% na Gestão; os demais em um grupo, 15% em dois
+        through = User.groups.through
+        memberships = []
+        for username, user_id in sorted(ids.items()):
+            if rng.random() < 0.02:
+                chosen = {groups[0].pk}
+            else:
+                chosen = {rng.choice(groups[1:] or groups).pk}
+                if rng.random() < 0.15:
+                    chosen.add(rng.choice(groups[1:] or groups).pk)
+            memberships += [through(user_id=user_id, group_id=group_id) for group_id in sorted(chosen)]
+        through.objects.bulk_create(memberships, batch_size=5000)
+        return sorted(ids.items())
+
+    def create_audit_logs(self, options, users, paineis):
+        if not paineis:
+            raise CommandError('São necessários painéis para gerar os logs')
+        tz = ZoneInfo(settings.TIME_ZONE)
+        end_day = options['end_date'] or datetime.now(tz).date()
+        end = datetime.combine(end_day + timedelta(days=1), datetime.min.time(), tz)
+        start = end - timedelta(days=options['days'])
+
+        rng = self.rng
+        user_rows = [
+            (user_id, username, f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+             rng.choice(USER_AGENTS))
+            for username, user_id in users
+        ]
+        # Poucos usuários concentram a maior parte dos acessos (Zipf)
+        user_weights = [1 / (rank + 1) ** 0.9 for rank in range(len(user_rows))]
+        rng.shuffle(user_weights)
+        context = {
+            'seed': options['seed'],
+            'users': user_rows,
+            'paineis': paineis,
+            'user_indexes': list(range(len(user_rows))),
+            'user_cum': list(accumulate(user_weights)),
+            'actions': [action for action, _ in ACTION_WEIGHTS],
+            'action_cum': list(accumulate(weight for _, weight in ACTION_WEIGHTS)),
+            'naive_utc': connection.vendor == 'sqlite',
+            'utc': ZoneInfo('UTC'),
+        }
+        chunks = plan_chunks(plan_slots(start, end, options['audit_logs'], tz), options['chunk_size'])
+        sql = audit_insert_sql()
+        deferred = connection.vendor == 'sqlite' and not options['keep_indexes']
+
+        stats = Counter()
+        written = 0
+        next_report = options['audit_logs'] / 10
+        generation = 0.0
+        load_started = time.perf_counter()
+        restore = drop_sqlite_audit_indexes() if deferred else []
+        try:
+            for rows, chunk_stats, seconds in self.iter_chunks(chunks, context, options['processes']):
+                generation += seconds
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(sql, rows)
+                written += len(rows)
+                stats.update(chunk_stats)
+                if written >= next_report or written == options['audit_logs']:
+                    next_report += options['audit_logs'] / 10
+                    elapsed = time.perf_counter() - load_started
+                    self.stdout.write(f'  logs: {written:,}/{options["audit_logs"]:,} ({written / elapsed:,.0f}/s)')
+        finally:
+            load_seconds = time.perf_counter() - load_started
+            index_started = time.perf_counter()
+            if restore:
+                restore_sqlite_audit_indexes(restore)
+            index_seconds = time.perf_counter() - index_started
+
+        stats_started = time.perf_counter()
+        with transaction.atomic():
+            add_audit_stats(stats)
+        stats_seconds = time.perf_counter() - stats_started
+
+        self.timings.append(('logs (carga)', written, load_seconds))
+        if options['processes'] <= 1:
+            self.timings.append(('logs (geração)', written, generation))
+        if restore:
+            self.timings.append(('logs (índices e FTS)', written, index_seconds))
+        self.timings.append(('logs (total)', written, load_seconds + index_seconds + stats_seconds))
+
+    def iter_chunks(self, chunks, context, processes):
+        """
+        Blocos na ordem de geração: (linhas, totais, segundos de geração).
+        Com processes > 1 um pool gera os blocos seguintes enquanto este
+        processo grava, com no máximo 2 blocos pendentes por processo.
+        """
+        if processes <= 1:
+            init_worker(context)
+            for task in chunks:
+                started = time.perf_counter()
+                rows, stats = generate_chunk(task)
+                yield rows, stats, time.perf_counter() - started
+            return
+
+        # Os processos filhos não usam o banco; não herdam conexões abertas
+        connections.close_all()
+        pool_context = multiprocessing.get_context('fork')
+        with pool_context.Pool(processes, initializer=init_worker, initargs=(context,)) as pool:
+            tasks = iter(chunks)
+            pending = deque(pool.apply_async(generate_chunk, (task,)) for task in islice(tasks, processes * 2))
+            while pending:
+                rows, stats = pending.popleft().get()
+                for task in islice(tasks, 1):
+                    pending.append(pool.apply_async(generate_chunk, (task,)))
+                yield rows, stats, 0.0
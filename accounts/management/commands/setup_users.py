@@ -5,19 +5,146 @@ Este comando cria:
 - Grupo "Gestão" com acesso total (José e Caio)
 - Grupo "Unidades" com acesso limitado (Rafael e Carlos)
 
+Com --roster, importa usuários de um arquivo CSV ou JSON (cadastro de uma
+unidade inteira). Colunas/chaves: username (obrigatória), password,
+first_name, last_name, email, groups (lista ou nomes separados por ";") e
+is_active. A importação compara o arquivo com o banco e grava apenas as
+diferenças, em uma única transação:
+- usuários novos: bulk_create, com as senhas calculadas em paralelo
+  (ProcessPoolExecutor); sem senha no arquivo, a senha fica inutilizável
+- usuários existentes: bulk_update apenas dos campos alterados; a senha só
+  é trocada com --reset-passwords (e se for diferente da atual)
+- senhas que serão gravadas passam pelos validadores (AUTH_PASSWORD_VALIDATORS);
+  se alguma for recusada, nada é gravado e as recusadas são listadas
+- grupos e associações: bulk_create dos que faltam (tabela de associação);
+  com --prune-groups remove as associações que não estão no arquivo
+
+Rodar duas vezes com o mesmo arquivo não altera nada na segunda vez;
+--dry-run mostra as diferenças sem gravar.
+
 Uso:
     python manage.py setup_users
+    python manage.py setup_users --roster unidade_norte.csv --dry-run
+    python manage.py setup_users --roster unidade_norte.json --workers 8 --prune-groups
 """
 
-from django.core.management.base import BaseCommand
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import User, Group
-from django.db import transaction
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+
+from accounts.menu import invalidate_menu_cache
+from accounts.permissions import bump_permissions_version
+
+# Campos do usuário aceitos no arquivo (além de username, password e groups)
+ROSTER_FIELDS = ('first_name', 'last_name', 'email', 'is_active')
+TRUE_VALUES = ('1', 'true', 'sim', 's', 'yes', 'y')
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _parse_groups(value):
+    if isinstance(value, (list, tuple)):
+        names = value
+    else:
+        names = (value or '').split(';')
+    return sorted({str(name).strip() for name in names if str(name).strip()})
+
+
+def load_roster(path):
+    """
+    Lê o arquivo de usuários (CSV ou JSON, pela extensão).
+
+    Returns:
+        list: dicts com username, password, groups e os campos de ROSTER_FIELDS presentes
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        rows = json.loads(path.read_text(encoding='utf-8'))
+        if isinstance(rows, dict):
+            rows = rows.get('users', [])
+    elif path.suffix.lower() == '.csv':
+        with path.open(encoding='utf-8-sig', newline='') as roster_file:
+            rows = list(csv.DictReader(roster_file))
+    else:
+        raise CommandError('Use um arquivo .csv ou .json')
+
+    entries = {}
+    for line, row in enumerate(rows, start=1):
+        username = str(row.get('username') or '').strip()
+        if not username:
+            raise CommandError(f'Registro {line}: username obrigatório')
+        if username in entries:
+            raise CommandError(f'Registro {line}: username "{username}" repetido')
+        entry = {
+            'username': username,
+            'password': row.get('password') or None,
+            'groups': _parse_groups(row.get('groups')),
+        }
+        for field in ROSTER_FIELDS:
+            value = row.get(field)
+            if value is None or value == '':
+                continue
+            entry[field] = _parse_bool(value) if field == 'is_active' else str(value).strip()
+        entries[username] = entry
+    return list(entries.values())
+
+
+def _password_matches(args):
+    raw, encoded = args
+    return check_password(raw, encoded)
+
+
+def run_in_processes(func, items, workers):
+    """
+    Aplica func aos itens em um ProcessPoolExecutor (PBKDF2 é CPU-bound e
+    segura o GIL). Com workers <= 1 ou poucos itens, roda no próprio processo.
+    """
+    items = list(items)
+    if workers <= 1 or len(items) < 2:
+        return [func(item) for item in items]
+    # Os processos filhos (fork) não podem herdar conexões abertas
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        return list(pool.map(func, items, chunksize=max(1, len(items) // (workers * 4))))
 
 
 class Command(BaseCommand):
-    help = 'Inicializa o banco de dados com usuários e grupos de exemplo'
+    help = 'Inicializa o banco de dados com usuários e grupos de exemplo ou importa um arquivo de usuários'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--roster', help='Arquivo CSV ou JSON com os usuários a importar')
+        parser.add_argument('--dry-run', action='store_true', help='Mostra as diferenças sem gravar')
+        parser.add_argument(
+            '--reset-passwords', action='store_true',
+            help='Troca a senha dos usuários existentes pela do arquivo (quando diferente)',
+        )
+        parser.add_argument(
+            '--prune-groups', action='store_true',
+            help='Remove as associações a grupos que não estão no arquivo',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processos para o cálculo das senhas (padrão: nº de CPUs)',
+        )
 
     def handle(self, *args, **options):
+        if options['roster']:
+            return self.import_roster(options)
+
         self.stdout.write(self.style.WARNING('Iniciando configuração de usuários e grupos...'))
         
         try:
@@ -141,3 +268,135 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Erro ao configurar usuários: {str(e)}'))
             raise
+
+    def import_roster(self, options):
+        entries = load_roster(options['roster'])
+        usernames = [entry['username'] for entry in entries]
+        existing = {user.username: user for user in User.objects.filter(username__in=usernames)}
+
+        # Senhas (PBKDF2) calculadas antes da transação, em paralelo
+        new_passwords = [
+            entry['password'] for entry in entries
+            if entry['username'] not in existing and entry['password']
+        ]
+        check = []
+        if options['reset_passwords']:
+            check = [
+                entry for entry in entries
+                if entry['username'] in existing and entry['password']
+            ]
+        matches = run_in_processes(
+            _password_matches,
+            [(entry['password'], existing[entry['username']].password) for entry in check],
+            options['workers'],
+        )
+        changed_passwords = [entry for entry, same in zip(check, matches) if not same]
+        self.validate_roster_passwords(
+            [
+                (entry, User(username=entry['username'], **{
+                    field: entry[field] for field in ROSTER_FIELDS if field in entry
+                }))
+                for entry in entries if entry['username'] not in existing and entry['password']
+            ]
+            + [(entry, existing[entry['username']]) for entry in changed_passwords]
+        )
+        hashes = run_in_processes(
+            make_password,
+            new_passwords + [entry['password'] for entry in changed_passwords],
+            options['workers'],
+        )
+        hashes = iter(hashes)
+
+        # Atualizações por pk: um usuário com campos e senha alterados entra uma vez
+        to_create, to_update, update_fields = [], {}, set()
+        for entry in entries:
+            user = existing.get(entry['username'])
+            if user is None:
+                user = User(
+                    username=entry['username'],
+                    password=next(hashes) if entry['password'] else make_password(None),
+                    **{field: entry[field] for field in ROSTER_FIELDS if field in entry},
+                )
+                to_create.append(user)
+                continue
+            changed = [
+                field for field in ROSTER_FIELDS
+                if field in entry and getattr(user, field) != entry[field]
+            ]
+            for field in changed:
+                setattr(user, field, entry[field])
+            if changed:
+                update_fields.update(changed)
+                to_update[user.pk] = user
+        for entry in changed_passwords:
+            user = existing[entry['username']]
+            user.password = next(hashes)
+            update_fields.add('password')
+            to_update[user.pk] = user
+
+        with transaction.atomic():
+            group_names = sorted({name for entry in entries for name in entry['groups']})
+            groups = {group.name: group for group in Group.objects.filter(name__in=group_names)}
+            missing_groups = [Group(name=name) for name in group_names if name not in groups]
+
+            if not options['dry_run']:
+                Group.objects.bulk_create(missing_groups)
+                groups = {group.name: group for group in Group.objects.filter(name__in=group_names)}
+                User.objects.bulk_create(to_create, batch_size=1000)
+                if to_update:
+                    User.objects.bulk_update(list(to_update.values()), sorted(update_fields), batch_size=1000)
+
+            user_ids = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+            through = User.groups.through
+            current = {
+                (username, name): pk for pk, username, name in
+                through.objects.filter(user__username__in=usernames)
+                .values_list('pk', 'user__username', 'group__name')
+            }
+            wanted = {(entry['username'], name) for entry in entries for name in entry['groups']}
+            added = sorted(wanted - current.keys())
+            removed = sorted(current.keys() - wanted) if options['prune_groups'] else []
+
+            if not options['dry_run']:
+                through.objects.bulk_create(
+                    [through(user_id=user_ids[username], group_id=groups[name].pk) for username, name in added],
+                    batch_size=5000, ignore_conflicts=True,
+                )
+                through.objects.filter(pk__in=[current[key] for key in removed]).delete()
+
+        if not options['dry_run'] and (added or removed or missing_groups):
+            # bulk_create na tabela de associação não dispara m2m_changed
+            invalidate_menu_cache()
+            bump_permissions_version()
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        if options['verbosity'] >= 2:
+            for user in to_create:
+                self.stdout.write(f'{prefix}+ {user.username}')
+            for user in to_update.values():
+                self.stdout.write(f'{prefix}~ {user.username}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}✓ {len(entries)} usuários no arquivo: {len(to_create)} criados, '
+            f'{len(to_update)} atualizados ({len(changed_passwords)} senhas), '
+            f'{len(missing_groups)} grupos criados, {len(added)} associações incluídas, '
+            f'{len(removed)} removidas'
+        ))
+
+    def validate_roster_passwords(self, pending):
+        """
+        Aplica AUTH_PASSWORD_VALIDATORS às senhas que serão gravadas.
+
+        Args:
+            pending: pares (registro do arquivo, usuário) com senha a gravar
+        """
+        errors = []
+        for entry, user in pending:
+            try:
+                validate_password(entry['password'], user)
+            except ValidationError as e:
+                errors.append(f'{entry["username"]}: {" ".join(e.messages)}')
+        if errors:
+            raise CommandError(
+                f'{len(errors)} senha(s) recusada(s) pelos validadores; nada foi gravado:\n  '
+                + '\n  '.join(errors)
+            )
@@ -0,0 +1,50 @@
+"""
+Command de manutenção periódica do banco SQLite.
+
+Executa PRAGMA optimize (atualiza as estatísticas do planejador apenas onde
+necessário) e, opcionalmente, ANALYZE completo, checkpoint do WAL e a
+compactação do índice de busca textual dos logs. Agendar via cron, ex.:
+
+    */30 * * * *  python manage.py sqlite_maintenance
+    0 3 * * *     python manage.py sqlite_maintenance --analyze --checkpoint --optimize-fts
+
+Uso:
+    python manage.py sqlite_maintenance [--analyze] [--checkpoint] [--optimize-fts]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.search import FTS_TABLE, fts_available
+
+
+class Command(BaseCommand):
+    help = 'Manutenção do SQLite: optimize/ANALYZE, checkpoint do WAL e índice FTS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Executa ANALYZE completo')
+        parser.add_argument('--checkpoint', action='store_true', help='Checkpoint (TRUNCATE) do arquivo WAL')
+        parser.add_argument('--optimize-fts', action='store_true', help='Compacta o índice FTS5 dos logs')
+
+    def step(self, label, sql):
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            result = cursor.fetchall() if cursor.description else None
+        elapsed = time.perf_counter() - started
+        detail = f' {result}' if result else ''
+        self.stdout.write(self.style.SUCCESS(f'✓ {label} ({elapsed:.2f}s){detail}'))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Este comando se aplica apenas ao SQLite.')
+
+        if options['analyze']:
+            self.step('ANALYZE', 'ANALYZE')
+        self.step('PRAGMA optimize', 'PRAGMA optimize')
+        if options['optimize_fts'] and fts_available():
+            self.step('Índice FTS5 compactado', f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        if options['checkpoint']:
+            self.step('Checkpoint do WAL (busy, log, checkpointed)', 'PRAGMA wal_checkpoint(TRUNCATE)')
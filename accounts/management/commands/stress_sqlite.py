@@ -0,0 +1,138 @@
+"""
+Command de teste de estresse de escrita concorrente no banco.
+
+Cria N processos (fork), como os workers do Gunicorn, que durante alguns
+segundos gravam logs de auditoria (log_action) e, opcionalmente, fazem
+logins (sessão + last_login + log). Ao final informa a vazão e quantos erros
+de lock ("database is locked") ocorreram. Use em uma cópia do banco: os
+registros gerados permanecem nas tabelas.
+
+Nos processos o buffer de auditoria, o agrupamento e a amostragem ficam
+desligados: cada log é um INSERT na hora, e um erro de lock chega ao
+contador (o buffer apenas registraria a falha e tentaria de novo). O tempo
+dos logins (hash PBKDF2) é medido à parte, sem entrar na vazão de escrita.
+
+Uso:
+    python manage.py stress_sqlite --processes 6 --duration 10
+    python manage.py stress_sqlite --login-every 20
+"""
+
+import multiprocessing
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client, override_settings
+
+from accounts.audit_utils import log_action
+from accounts.benchmark import benchmark_user
+
+STRESS_USERNAME = 'stress'
+STATS = ('writes', 'logins', 'login_failures', 'locked', 'errors', 'write_seconds', 'login_seconds')
+
+
+def stress_worker(password, duration, login_every, results):
+    """Executado em cada processo filho"""
+    # Conexões herdadas do processo pai não podem ser compartilhadas
+    for conn in connections.all():
+        conn.inc_thread_sharing()
+        conn.close()
+        conn.dec_thread_sharing()
+
+    # Gravação síncrona: mede o banco, não a fila em memória
+    override_settings(AUDIT_LOG_BUFFER=dict(
+        settings.AUDIT_LOG_BUFFER, ENABLED=False, COALESCE_ACTIONS=[], SAMPLE_RATES={},
+    )).enable()
+
+    user = User.objects.get(username=STRESS_USERNAME)
+    client = Client()
+    stats = dict.fromkeys(STATS, 0)
+    deadline = time.monotonic() + duration
+    iteration = 0
+    while time.monotonic() < deadline:
+        iteration += 1
+        try:
+            if login_every and iteration % login_every == 0:
+                started = time.perf_counter()
+                logged_in = client.login(username=STRESS_USERNAME, password=password)
+                stats['login_seconds'] += time.perf_counter() - started
+                if not logged_in:
+                    stats['login_failures'] += 1
+                    continue
+                action, key = 'LOGIN', 'logins'
+            else:
+                action, key = 'VIEW', 'writes'
+            started = time.perf_counter()
+            try:
+                log_action(user, action, 'Teste de carga (stress_sqlite)', severity='INFO')
+            finally:
+                stats['write_seconds'] += time.perf_counter() - started
+            stats[key] += 1
+        except OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                stats['locked'] += 1
+            else:
+                stats['errors'] += 1
+    connections.close_all()
+    results.put(stats)
+
+
+class Command(BaseCommand):
+    help = 'Teste de estresse de escrita concorrente (auditoria e login) com N processos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=6, help='Nº de processos')
+        parser.add_argument('--duration', type=float, default=10.0, help='Duração (segundos)')
+        parser.add_argument(
+            '--login-every', type=int, default=0,
+            help='Um login a cada N operações (0 = sem logins, só escrita)',
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_user(STRESS_USERNAME) as (_, password):
+            connections.close_all()
+            totals, elapsed = self.run_workers(password, options)
+
+        inserts = totals['writes'] + totals['logins']
+        # Vazão de escrita: INSERTs por segundo de escrita (sem o hash dos logins)
+        write_wall = totals['write_seconds'] / options['processes']
+        self.stdout.write(
+            f'{options["processes"]} processos, {elapsed:.1f}s: '
+            f'{inserts} logs gravados ({inserts / write_wall if write_wall else 0:.0f} INSERTs/s, '
+            f'{totals["write_seconds"] * 1000 / max(inserts, 1):.2f} ms por INSERT)'
+        )
+        if totals['logins'] or totals['login_failures']:
+            attempts = totals['logins'] + totals['login_failures']
+            self.stdout.write(
+                f'logins: {totals["logins"]} ({totals["login_seconds"] * 1000 / attempts:.0f} ms por login, '
+                f'medidos à parte)'
+            )
+        failures = totals['locked'] + totals['errors'] + totals['login_failures']
+        style = self.style.SUCCESS if not failures else self.style.ERROR
+        self.stdout.write(style(
+            f'Erros de lock: {totals["locked"]} | logins recusados: {totals["login_failures"]} | '
+            f'outros erros: {totals["errors"]}'
+        ))
+
+    def run_workers(self, password, options):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [
+            context.Process(
+                target=stress_worker,
+                args=(password, options['duration'], options['login_every'], results),
+            )
+            for _ in range(options['processes'])
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        totals = dict.fromkeys(STATS, 0)
+        for _ in processes:
+            for key, value in results.get().items():
+                totals[key] += value
+        for process in processes:
+            process.join()
+        return totals, time.perf_counter() - started
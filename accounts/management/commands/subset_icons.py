@@ -0,0 +1,137 @@
+"""
+Command que gera o subconjunto da fonte Bootstrap Icons usado pelo sistema.
+
+Lê a fonte e o CSS completos de assets/bootstrap-icons/ (fora de
+STATICFILES_DIRS), procura as classes bi-* usadas nos templates, no código
+Python (ex.: valores padrão dos modelos; os testes ficam de fora), nos
+scripts estáticos e nos ícones cadastrados em CategoriaPainel/PainelBI, e
+grava em static/vendor/bootstrap-icons/ apenas os glifos e regras CSS
+necessários.
+
+O campo icone de CategoriaPainel/PainelBI só aceita ícones do subconjunto
+gerado (accounts/icons.py); para liberar um ícone novo no admin, rode o
+comando com --extra. Rode o comando no banco de produção (ou com --extra
+para cada ícone cadastrado lá): um ícone cadastrado fora do subconjunto
+aparece em branco.
+
+Requer fonttools e brotli (pip install fonttools brotli), apenas no momento
+de gerar os arquivos.
+
+Uso:
+    python manage.py subset_icons
+    python manage.py subset_icons --extra bi-star --extra bi-truck
+    python manage.py subset_icons --skip-db
+"""
+
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.icons import ICON_RULE_RE, available_icons
+
+SOURCE_DIR = Path(settings.BASE_DIR) / 'assets' / 'bootstrap-icons'
+OUTPUT_DIR = Path(settings.BASE_DIR) / 'static' / 'vendor' / 'bootstrap-icons'
+FONT_FILE = Path('fonts') / 'bootstrap-icons.woff2'
+
+ICON_CLASS_RE = re.compile(r'\bbi-[a-z0-9]+(?:-[a-z0-9]+)*')
+HEADER_RE = re.compile(r'^/\*!.*?\*/', re.DOTALL)
+
+# Extensões e diretórios examinados em busca de classes bi-*
+SCAN_SUFFIXES = ('.html', '.py', '.js')
+SCAN_DIRS = ('templates', 'accounts', 'paineis_bi', 'static/js')
+# Ícones citados só pelos testes não entram na fonte publicada
+SKIP_FILES = ('tests.py',)
+SKIP_DIRS = ('tests',)
+
+BASE_RULES = (
+    '@font-face{font-display:block;font-family:bootstrap-icons;'
+    f'src:url("{FONT_FILE.as_posix()}") format("woff2")}}'
+    '.bi::before,[class*=" bi-"]::before,[class^=bi-]::before{display:inline-block;'
+    'font-family:bootstrap-icons!important;font-style:normal;font-weight:400!important;'
+    'font-variant:normal;text-transform:none;line-height:1;vertical-align:-.125em;'
+    '-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale}'
+)
+
+
+def find_icon_classes(base_dir):
+    """Classes bi-* citadas nos arquivos do projeto"""
+    found = set()
+    for directory in SCAN_DIRS:
+        root = Path(base_dir) / directory
+        if not root.exists():
+            continue
+        for path in root.rglob('*'):
+            if path.name in SKIP_FILES or set(path.relative_to(root).parts[:-1]) & set(SKIP_DIRS):
+                continue
+            if path.suffix in SCAN_SUFFIXES and path.is_file():
+                found.update(ICON_CLASS_RE.findall(path.read_text(encoding='utf-8', errors='ignore')))
+    return found
+
+
+def database_icon_classes():
+    """Ícones cadastrados nas categorias e painéis"""
+    from accounts.models import CategoriaPainel, PainelBI
+
+    found = set()
+    for model in (CategoriaPainel, PainelBI):
+        for value in model.objects.values_list('icone', flat=True).distinct():
+            found.update(ICON_CLASS_RE.findall(value or ''))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera o subconjunto da fonte Bootstrap Icons com os ícones usados no código e no banco; '
+        'o admin só aceita ícones desse subconjunto (outros exigem --extra)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-db', action='store_true',
+            help='Não inclui os ícones cadastrados em CategoriaPainel/PainelBI',
+        )
+        parser.add_argument(
+            '--extra', action='append', default=[], metavar='CLASSE',
+            help='Classe bi-* adicional (pode repetir)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+        except ImportError:
+            raise CommandError('fonttools não está instalado (pip install fonttools brotli)')
+
+        source_css = (SOURCE_DIR / 'bootstrap-icons.min.css').read_text(encoding='utf-8')
+        codepoints = dict(ICON_RULE_RE.findall(source_css))
+        header = HEADER_RE.match(source_css)
+
+        wanted = find_icon_classes(settings.BASE_DIR) | set(options['extra'])
+        if not options['skip_db']:
+            wanted |= database_icon_classes()
+        # Classes bi-* que não são ícones (ex.: nomes de classes CSS próprias)
+        icons = sorted(name for name in wanted if name in codepoints)
+
+        rules = ''.join(f'.{name}::before{{content:"\\{codepoints[name]}"}}' for name in icons)
+        (OUTPUT_DIR / FONT_FILE.parent).mkdir(parents=True, exist_ok=True)
+        (OUTPUT_DIR / 'bootstrap-icons.css').write_text(
+            (header.group(0) if header else '') + BASE_RULES + rules + '\n', encoding='utf-8'
+        )
+
+        font_options = subset.Options()
+        font_options.flavor = 'woff2'
+        font_options.layout_features = ['*']
+        font = subset.load_font(str(SOURCE_DIR / FONT_FILE), font_options)
+        subsetter = subset.Subsetter(font_options)
+        subsetter.populate(unicodes=[int(codepoints[name], 16) for name in icons])
+        subsetter.subset(font)
+        subset.save_font(font, str(OUTPUT_DIR / FONT_FILE), font_options)
+        available_icons.cache_clear()
+
+        source_size = (SOURCE_DIR / FONT_FILE).stat().st_size
+        output_size = (OUTPUT_DIR / FONT_FILE).stat().st_size
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(icons)} de {len(codepoints)} ícones | fonte: '
+            f'{source_size / 1024:.0f} KiB -> {output_size / 1024:.1f} KiB'
+        ))
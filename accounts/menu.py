@@ -0,0 +1,208 @@
+"""
+Montagem e cache do menu lateral dos Painéis BI.
+
+O menu depende apenas do conjunto de grupos do usuário (ou do acesso total
+da Gestão) e do catálogo de CategoriaPainel/PainelBI. Por isso a árvore é
+guardada no cache com uma chave por conjunto de grupos e invalidada pelos
+sinais em accounts/signals.py sempre que o catálogo muda.
+
+A versão do catálogo (parte da chave das árvores e do ETag dos painéis) é
+um valor aleatório: se a chave for descartada do cache, a nova versão não
+coincide com nenhuma anterior e nenhuma árvore antiga volta a ser usada. A
+invalidação só alcança os outros servidores se o cache for compartilhado
+entre eles (Redis/Memcached, ver DJANGO_CACHE_BACKEND no README).
+
+A árvore é composta apenas de dicts (serializáveis) com os mesmos nomes de
+atributos dos modelos, para que o template funcione com ambos.
+"""
+
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import CategoriaPainel, PainelBI
+from .resource_hints import url_origin
+
+MENU_VERSION_KEY = 'paineis:menu:version'
+MENU_MODIFIED_KEY = 'paineis:menu:modified'
+
+
+def _categoria_info(categoria):
+    return {
+        'id': categoria.id,
+        'nome': categoria.nome,
+        'icone': categoria.icone,
+    }
+
+
+def _painel_info(painel, categoria_info):
+    return {
+        'id': painel.id,
+        'titulo': painel.titulo,
+        'descricao': painel.descricao,
+        'icone': painel.icone,
+        'iframe_url': painel.iframe_url,
+        'tem_iframe': painel.tem_iframe,
+        'iframe_origin': url_origin(painel.iframe_url),
+        'grupo_acesso_id': painel.grupo_acesso_id,
+        'categoria': categoria_info,
+    }
+
+
+def _menu_queryset(group_ids=None):
+    paineis = (
+        PainelBI.objects
+        .filter(ativo=True, categoria__ativo=True)
+        .select_related('categoria')
+        .order_by('categoria__ordem', 'categoria__nome', 'categoria_id', 'ordem', 'titulo')
+    )
+    if group_ids is not None:
+        paineis = paineis.filter(grupo_acesso__id__in=group_ids)
+    return paineis
+
+
+def _group_by_categoria(paineis):
+    tree = []
+    categoria_info = None
+    for painel in paineis:
+        if categoria_info is None or categoria_info['id'] != painel.categoria_id:
+            categoria_info = _categoria_info(painel.categoria)
+            categoria_info['paineis'] = []
+            tree.append(categoria_info)
+        categoria_info['paineis'].append(_painel_info(painel, categoria_info))
+    return tree
+
+
+def build_menu_tree(group_ids=None):
+    """
+    Monta a árvore categoria -> painéis visíveis com uma única consulta,
+    independente do número de categorias e painéis.
+
+    Args:
+        group_ids: IDs dos grupos do usuário; None = acesso total (Gestão)
+
+    Returns:
+        list: Categorias (dict) com a lista 'paineis' já filtrada
+    """
+    return _group_by_categoria(_menu_queryset(group_ids))
+
+
+async def abuild_menu_tree(group_ids=None):
+    """Versão assíncrona de build_menu_tree (ORM assíncrono)"""
+    return _group_by_categoria([painel async for painel in _menu_queryset(group_ids)])
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_menu_version():
+    """Versão atual do catálogo; muda a cada invalidação"""
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        # Chave ausente = versão desconhecida: começa uma nova
+        cache.add(MENU_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+async def aget_menu_version():
+    """Versão assíncrona de get_menu_version"""
+    version = await cache.aget(MENU_VERSION_KEY)
+    if version is None:
+        await cache.aadd(MENU_VERSION_KEY, _new_version(), timeout=None)
+        version = await cache.aget(MENU_VERSION_KEY)
+    return version
+
+
+def invalidate_menu_cache():
+    """Descarta todas as árvores em cache (de todos os conjuntos de grupos)"""
+    cache.set(MENU_VERSION_KEY, _new_version(), timeout=None)
+    cache.set(MENU_MODIFIED_KEY, timezone.now(), timeout=None)
+
+
+async def aget_catalog_modified():
+    """
+    Data da última alteração do catálogo, lida do cache: a última invalidação
+    ou, com o cache vazio, max(atualizado_em) de categorias e painéis.
+    """
+    modified = await cache.aget(MENU_MODIFIED_KEY)
+    if modified is None:
+        values = [
+            (await model.objects.aaggregate(ultimo=Max('atualizado_em')))['ultimo']
+            for model in (CategoriaPainel, PainelBI)
+        ]
+        modified = max(filter(None, values), default=datetime(2000, 1, 1, tzinfo=dt_timezone.utc))
+        await cache.aadd(MENU_MODIFIED_KEY, modified, timeout=None)
+        modified = await cache.aget(MENU_MODIFIED_KEY, modified)
+    return modified
+
+
+def _menu_cache_key(version, group_ids):
+    if group_ids is None:
+        scope = 'todos'
+    else:
+        scope = 'grupos:' + ','.join(str(group_id) for group_id in sorted(set(group_ids)))
+    return f'paineis:menu:v{version}:{scope}'
+
+
+def menu_cache_key(group_ids=None):
+    return _menu_cache_key(get_menu_version(), group_ids)
+
+
+def get_menu_tree(group_ids=None):
+    """
+    Retorna a árvore do menu a partir do cache, montando-a se necessário.
+
+    Args:
+        group_ids: IDs dos grupos do usuário; None = acesso total (Gestão)
+    """
+    key = menu_cache_key(group_ids)
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_menu_tree(group_ids)
+        cache.set(key, tree, timeout=getattr(settings, 'MENU_CACHE_TIMEOUT', 600))
+    return tree
+
+
+async def aget_menu_tree(group_ids=None, version=None):
+    """
+    Versão assíncrona de get_menu_tree.
+
+    Args:
+        version: Versão do catálogo já lida (aget_menu_version), se houver
+    """
+    if version is None:
+        version = await aget_menu_version()
+    key = _menu_cache_key(version, group_ids)
+    tree = await cache.aget(key)
+    if tree is None:
+        tree = await abuild_menu_tree(group_ids)
+        await cache.aset(key, tree, timeout=getattr(settings, 'MENU_CACHE_TIMEOUT', 600))
+    return tree
+
+
+def painel_menu_item(painel):
+    """Converte um PainelBI no mesmo formato dos itens da árvore"""
+    return _painel_info(painel, _categoria_info(painel.categoria))
+
+
+def find_painel(tree, painel_id):
+    """Localiza um painel na árvore; None se não estiver visível"""
+    for categoria in tree:
+        for painel in categoria['paineis']:
+            if painel['id'] == painel_id:
+                return painel
+    return None
+
+
+def first_painel(tree):
+    """Primeiro painel visível do menu (ou None)"""
+    for categoria in tree:
+        if categoria['paineis']:
+            return categoria['paineis'][0]
+    return None
@@ -0,0 +1,433 @@
+"""
+Métricas de desempenho por view, expostas em /metrics no formato texto do
+Prometheus.
+
+O MetricsMiddleware registra, para cada requisição, o nome da rota resolvida
+(ex.: accounts:paineis_bi), a latência, o nº de consultas e o tempo gasto no
+banco, o tempo de renderização dos templates (backend
+InstrumentedDjangoTemplates) e o tamanho da resposta.
+
+As consultas são contadas por um execute_wrapper instalado em toda conexão
+aberta (sinal connection_created, ver AccountsConfig.ready), que soma na
+requisição do contexto atual. Sob ASGI o ORM das views assíncronas roda em
+outra thread (sync_to_async), com outra conexão; o contexto acompanha a
+chamada, a conexão não.
+
+Os agregados ficam em memória, por processo (worker do Gunicorn), e são
+gravados por uma thread em segundo plano em DIR/worker-<pid>.json a cada
+FLUSH_INTERVAL segundos. O endpoint soma os arquivos de todos os workers;
+ao encerrar, cada worker incorpora seus totais em DIR/archive.json, para que
+os contadores não diminuam quando o Gunicorn recicla os processos.
+
+Configuração (settings.METRICS):
+    ENABLED: liga/desliga a coleta
+    DIR: diretório compartilhado pelos workers
+    FLUSH_INTERVAL: intervalo (segundos) entre gravações dos agregados
+    BUCKETS: limites (segundos) do histograma de latência
+"""
+
+import atexit
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'DIR': None,
+    'FLUSH_INTERVAL': 10.0,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+}
+
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = 'archive.lock'
+# Requisições que não casaram com nenhuma rota (ex.: 404) não criam rótulos novos
+UNRESOLVED_VIEW = 'unresolved'
+
+
+def get_config():
+    """Retorna a configuração das métricas mesclada com os valores padrão"""
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'METRICS', {}))
+    return config
+
+
+class RequestMetrics:
+    """Contadores de uma requisição em andamento"""
+
+    __slots__ = ('db_queries', 'db_seconds', 'template_seconds')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """Wrapper de connection.execute_wrapper: conta e cronometra as consultas"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.db_queries += 1
+
+
+# Requisição em andamento; o contexto acompanha o sync_to_async das views assíncronas
+_current_request = contextvars.ContextVar('paineis_metrics_request', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Wrapper permanente das conexões: conta a consulta na requisição em andamento"""
+    current = _current_request.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    return current.db_wrapper(execute, sql, params, many, context)
+
+
+def install_db_wrapper(sender, connection, **kwargs):
+    """Receptor de connection_created (a mesma conexão pode reconectar)"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def track_request():
+    """Associa um RequestMetrics novo ao contexto atual"""
+    current = RequestMetrics()
+    token = _current_request.set(current)
+    try:
+        yield current
+    finally:
+        _current_request.reset(token)
+
+
+def _empty_view(size):
+    return {
+        'buckets': [0] * size,
+        'count': 0,
+        'sum': 0.0,
+        'status': {},
+        'db_queries': 0,
+        'db_seconds': 0.0,
+        'template_seconds': 0.0,
+        'response_bytes': 0,
+    }
+
+
+def merge_views(target, source, size):
+    """Soma os agregados de source em target (ambos {view: dados})"""
+    for view, data in source.items():
+        merged = target.setdefault(view, _empty_view(size))
+        # Arquivos gravados com outros limites de histograma mantêm só soma/contagem
+        if len(data['buckets']) == size:
+            merged['buckets'] = [a + b for a, b in zip(merged['buckets'], data['buckets'])]
+        for key in ('count', 'sum', 'db_queries', 'db_seconds', 'template_seconds', 'response_bytes'):
+            merged[key] += data[key]
+        for status, count in data['status'].items():
+            merged['status'][status] = merged['status'].get(status, 0) + count
+    return target
+
+
+class MetricsRegistry:
+    """
+    Agregados de um processo, por nome de view.
+    Thread-safe; a thread de gravação é iniciada sob demanda.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializa a gravação do arquivo do worker e o retire()
+        self._file_lock = threading.Lock()
+        self._views = {}
+        self._dirty = False
+        self._token = uuid.uuid4().hex
+        self._thread = None
+
+    def observe(self, view, status, duration, response_bytes, request_metrics):
+        """Registra uma requisição concluída"""
+        bounds = get_config()['BUCKETS']
+        with self._lock:
+            data = self._views.get(view)
+            if data is None:
+                data = self._views[view] = _empty_view(len(bounds))
+            for index, bound in enumerate(bounds):
+                if duration <= bound:
+                    data['buckets'][index] += 1
+                    break
+            data['count'] += 1
+            data['sum'] += duration
+            status = str(status)
+            data['status'][status] = data['status'].get(status, 0) + 1
+            data['db_queries'] += request_metrics.db_queries
+            data['db_seconds'] += request_metrics.db_seconds
+            data['template_seconds'] += request_metrics.template_seconds
+            if response_bytes is not None:
+                data['response_bytes'] += response_bytes
+            self._dirty = True
+        self._ensure_thread()
+
+    def snapshot(self):
+        """Cópia dos agregados deste processo"""
+        with self._lock:
+            return json.loads(json.dumps(self._views))
+
+    def write(self):
+        """
+        Grava os agregados em DIR/worker-<pid>.json (substituição atômica).
+
+        Returns:
+            bool: True se o arquivo foi gravado
+        """
+        with self._file_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                payload = {
+                    'pid': os.getpid(),
+                    'token': self._token,
+                    'buckets': list(get_config()['BUCKETS']),
+                    'views': json.loads(json.dumps(self._views)),
+                }
+                self._dirty = False
+            directory = metrics_dir()
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f'worker-{payload["pid"]}.json'
+            previous = _read_json(path)
+            if previous and previous.get('token') != self._token:
+                # Arquivo de um processo encerrado sem retire() com o mesmo pid
+                _archive(previous)
+            tmp_path = directory / f'.worker-{payload["pid"]}.tmp'
+            tmp_path.write_text(json.dumps(payload), encoding='utf-8')
+            os.replace(tmp_path, path)
+            return True
+
+    def retire(self):
+        """
+        Incorpora os totais deste processo ao archive.json e remove o
+        arquivo do worker. Usado no encerramento do processo.
+        """
+        with self._file_lock:
+            with self._lock:
+                views, self._views = self._views, {}
+                self._dirty = False
+            if views:
+                _archive(
+                    {'buckets': list(get_config()['BUCKETS']), 'views': views},
+                    remove=metrics_dir() / f'worker-{os.getpid()}.json',
+                )
+            return len(views)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(get_config()['FLUSH_INTERVAL'])
+            try:
+                self.write()
+            except OSError:
+                logger.exception('Falha ao gravar as métricas do worker')
+
+    def _reset_after_fork(self):
+        # Threads não sobrevivem ao fork: o processo filho começa do zero
+        self._lock = threading.Lock()
+        # Serializa a gravação do arquivo do worker e o retire()
+        self._file_lock = threading.Lock()
+        self._views = {}
+        self._dirty = False
+        self._token = uuid.uuid4().hex
+        self._thread = None
+
+
+registry = MetricsRegistry()
+
+
+def metrics_dir():
+    """Diretório compartilhado pelos workers"""
+    return Path(get_config()['DIR'] or '/tmp/paineis_bi_metrics')
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _archive_lock(directory):
+    with open(directory / LOCK_FILE, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _archive(payload, remove=None):
+    """
+    Soma os agregados do payload ao archive.json (com lock entre processos)
+    e remove o arquivo do worker, se informado, sob o mesmo lock.
+    """
+    size = len(get_config()['BUCKETS'])
+    directory = metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with _archive_lock(directory):
+        path = directory / ARCHIVE_FILE
+        archive = _read_json(path) or {'views': {}}
+        if len(payload.get('buckets', ())) != size:
+            payload = {'views': {
+                view: dict(data, buckets=[]) for view, data in payload['views'].items()
+            }}
+        merge_views(archive['views'], payload['views'], size)
+        tmp_path = directory / '.archive.tmp'
+        tmp_path.write_text(json.dumps(archive), encoding='utf-8')
+        os.replace(tmp_path, path)
+        if remove is not None:
+            remove.unlink(missing_ok=True)
+
+
+def collect_metrics():
+    """
+    Soma os agregados de todos os workers (arquivos) e do processo atual
+    (memória, mais recente que o próprio arquivo).
+
+    Returns:
+        dict: {view: dados}
+    """
+    size = len(get_config()['BUCKETS'])
+    directory = metrics_dir()
+    own_file = f'worker-{os.getpid()}.json'
+    merged = {}
+    if directory.exists():
+        # Sob o lock, um worker que se encerra não é contado duas vezes (ou nenhuma)
+        with _archive_lock(directory):
+            paths = [directory / ARCHIVE_FILE] + sorted(directory.glob('worker-*.json'))
+            for path in paths:
+                if path.name == own_file:
+                    continue
+                payload = _read_json(path)
+                if payload:
+                    merge_views(merged, payload['views'], size)
+    return merge_views(merged, registry.snapshot(), size)
+
+
+def record_template_render(seconds):
+    """Soma o tempo de renderização à requisição em andamento (se houver)"""
+    current = _current_request.get()
+    if current is not None:
+        current.template_seconds += seconds
+
+
+class InstrumentedTemplate(Template):
+    """Template do backend Django que cronometra a renderização"""
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template_render(time.perf_counter() - started)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Backend DjangoTemplates que devolve InstrumentedTemplate. Só mede os
+    templates carregados pelo backend (render, TemplateResponse); includes
+    e extends contam no tempo do template principal.
+    """
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render_prometheus(views, bounds=None):
+    """Agregados no formato texto de exposição do Prometheus (0.0.4)"""
+    if bounds is None:
+        bounds = get_config()['BUCKETS']
+    ordered = sorted(views.items())
+    lines = [
+        '# HELP paineis_http_request_duration_seconds Latência das requisições por view.',
+        '# TYPE paineis_http_request_duration_seconds histogram',
+    ]
+    for view, data in ordered:
+        label = f'view="{_escape_label(view)}"'
+        cumulative = 0
+        for bound, count in zip(bounds, data['buckets']):
+            cumulative += count
+            lines.append(
+                f'paineis_http_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'paineis_http_request_duration_seconds_bucket{{{label},le="+Inf"}} {data["count"]}')
+        lines.append(f'paineis_http_request_duration_seconds_sum{{{label}}} {_format_number(data["sum"])}')
+        lines.append(f'paineis_http_request_duration_seconds_count{{{label}}} {data["count"]}')
+
+    lines += [
+        '# HELP paineis_http_requests_total Requisições por view e status.',
+        '# TYPE paineis_http_requests_total counter',
+    ]
+    for view, data in ordered:
+        for status, count in sorted(data['status'].items()):
+            lines.append(
+                f'paineis_http_requests_total{{view="{_escape_label(view)}",status="{_escape_label(status)}"}} {count}'
+            )
+
+    counters = (
+        ('paineis_db_queries_total', 'db_queries', 'Consultas ao banco por view.'),
+        ('paineis_db_query_duration_seconds_total', 'db_seconds', 'Tempo gasto no banco por view.'),
+        ('paineis_template_render_seconds_total', 'template_seconds', 'Tempo de renderização dos templates por view.'),
+        ('paineis_http_response_size_bytes_total', 'response_bytes', 'Bytes enviados no corpo das respostas por view.'),
+    )
+    for name, key, help_text in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for view, data in ordered:
+            lines.append(f'{name}{{view="{_escape_label(view)}"}} {_format_number(data[key])}')
+    return '\n'.join(lines) + '\n'
+
+
+def retire_metrics():
+    """Encerramento do processo: incorpora os totais ao archive.json"""
+    try:
+        return registry.retire()
+    except OSError:
+        logger.exception('Falha ao arquivar as métricas do worker')
+        return 0
+
+
+atexit.register(retire_metrics)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._reset_after_fork)
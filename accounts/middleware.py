@@ -0,0 +1,103 @@
+"""
+Middlewares do app accounts.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics
+
+SESSION_REFRESHED_KEY = '_refreshed_at'
+
+
+class SlidingSessionMiddleware:
+    """
+    Expiração deslizante da sessão com poucas gravações.
+
+    Substitui SESSION_SAVE_EVERY_REQUEST: a sessão só é regravada (renovando
+    a expiração do cookie e do registro no banco) depois que se passou a
+    fração SESSION_REFRESH_FRACTION de SESSION_COOKIE_AGE desde a última
+    renovação. Com 0.1 e 30 minutos, no máximo uma gravação a cada 3 minutos
+    por usuário; a inatividade máxima fica entre 27 e 30 minutos.
+
+    Deve vir depois de SessionMiddleware em MIDDLEWARE.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _interval(self):
+        return settings.SESSION_COOKIE_AGE * getattr(settings, 'SESSION_REFRESH_FRACTION', 0.1)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key and not session.is_empty():
+            now = int(time.time())
+            if now - session.get(SESSION_REFRESHED_KEY, 0) >= self._interval():
+                # Marca a sessão como modificada: SessionMiddleware a grava
+                session[SESSION_REFRESHED_KEY] = now
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Sob ASGI: lê a sessão pela API assíncrona, sem bloquear o event loop
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key and not session.is_empty():
+            now = int(time.time())
+            if now - await session.aget(SESSION_REFRESHED_KEY, 0) >= self._interval():
+                await session.aset(SESSION_REFRESHED_KEY, now)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Coleta as métricas por view expostas em /metrics (ver accounts/metrics.py).
+
+    Mede latência, consultas e tempo no banco, tempo de renderização dos
+    templates e tamanho da resposta, agregados pelo nome da rota resolvida.
+    Deve vir logo depois de WhiteNoiseMiddleware em MIDDLEWARE, para incluir
+    o custo dos demais middlewares e ignorar os arquivos estáticos.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.get_config()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with metrics.track_request() as current:
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started, current)
+        return response
+
+    async def __acall__(self, request):
+        # As consultas rodam em outra thread (sync_to_async), com outra conexão;
+        # metrics.record_query as encontra pelo contexto, que acompanha a chamada
+        started = time.perf_counter()
+        with metrics.track_request() as current:
+            response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - started, current)
+        return response
+
+    def _observe(self, request, response, duration, current):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else metrics.UNRESOLVED_VIEW
+        size = None if response.streaming else len(response.content)
+        metrics.registry.observe(view, response.status_code, duration, size, current)
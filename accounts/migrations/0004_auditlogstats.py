@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_painelbi_grupo_acesso'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('action', models.CharField(choices=[('LOGIN', 'Login'), ('LOGOUT', 'Logout'), ('VIEW', 'Visualização'), ('CREATE', 'Criação'), ('UPDATE', 'Atualização'), ('DELETE', 'Exclusão'), ('ACCESS_DENIED', 'Acesso Negado'), ('ERROR', 'Erro')], max_length=20, verbose_name='Ação')),
+                ('severity', models.CharField(choices=[('INFO', 'Informação'), ('WARNING', 'Aviso'), ('ERROR', 'Erro'), ('CRITICAL', 'Crítico')], max_length=10, verbose_name='Severidade')),
+                ('total', models.PositiveBigIntegerField(default=0, verbose_name='Total')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Auditoria',
+                'verbose_name_plural': 'Estatísticas de Auditoria',
+                'ordering': ['-dia', 'action', 'severity'],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'action', 'severity'), name='unique_auditlogstats_dia_action_severity')],
+            },
+        ),
+    ]
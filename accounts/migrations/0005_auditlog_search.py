@@ -0,0 +1,96 @@
+# Busca textual indexada nos logs de auditoria (ver accounts/search.py)
+
+from django.db import DatabaseError, migrations, transaction
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE accounts_auditlog_fts USING fts5(
+        username, description, path,
+        content='accounts_auditlog', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER accounts_auditlog_fts_ai AFTER INSERT ON accounts_auditlog BEGIN
+        INSERT INTO accounts_auditlog_fts(rowid, username, description, path)
+        VALUES (new.id, new.username, new.description, new.path);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_auditlog_fts_ad AFTER DELETE ON accounts_auditlog BEGIN
+        INSERT INTO accounts_auditlog_fts(accounts_auditlog_fts, rowid, username, description, path)
+        VALUES ('delete', old.id, old.username, old.description, old.path);
+    END
+    """,
+    """
+    CREATE TRIGGER accounts_auditlog_fts_au AFTER UPDATE ON accounts_auditlog BEGIN
+        INSERT INTO accounts_auditlog_fts(accounts_auditlog_fts, rowid, username, description, path)
+        VALUES ('delete', old.id, old.username, old.description, old.path);
+        INSERT INTO accounts_auditlog_fts(rowid, username, description, path)
+        VALUES (new.id, new.username, new.description, new.path);
+    END
+    """,
+    # Indexa os logs já existentes
+    "INSERT INTO accounts_auditlog_fts(accounts_auditlog_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS accounts_auditlog_fts_au',
+    'DROP TRIGGER IF EXISTS accounts_auditlog_fts_ad',
+    'DROP TRIGGER IF EXISTS accounts_auditlog_fts_ai',
+    'DROP TABLE IF EXISTS accounts_auditlog_fts',
+]
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS accounts_au_username_trgm ON accounts_auditlog USING gin (username gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS accounts_au_description_trgm ON accounts_auditlog USING gin (description gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS accounts_au_path_trgm ON accounts_auditlog USING gin (path gin_trgm_ops)',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS accounts_au_path_trgm',
+    'DROP INDEX IF EXISTS accounts_au_description_trgm',
+    'DROP INDEX IF EXISTS accounts_au_username_trgm',
+]
+
+
+def sqlite_has_fts5(cursor):
+    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+    return bool(cursor.fetchone()[0])
+
+
+def run_statements(statements_by_vendor):
+    def operation(apps, schema_editor):
+        connection = schema_editor.connection
+        statements = statements_by_vendor.get(connection.vendor, [])
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite' and not sqlite_has_fts5(cursor):
+                # Sem FTS5 a busca usa ICONTAINS (ver accounts/search.py)
+                return
+            try:
+                with transaction.atomic(using=connection.alias):
+                    for statement in statements:
+                        cursor.execute(statement)
+            except DatabaseError:
+                if connection.vendor != 'postgresql':
+                    raise
+                # Usuário sem permissão para CREATE EXTENSION: a busca funciona
+                # sem os índices de trigramas (ICONTAINS sem índice)
+                return
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_auditlogstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_statements({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_auditlog_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['username', '-timestamp'], name='accounts_au_usernam_ca0969_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['severity', '-timestamp'], name='accounts_au_severit_2992a7_idx'),
+        ),
+    ]
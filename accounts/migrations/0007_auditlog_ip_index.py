@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_auditlog_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['ip_address', '-timestamp'], name='accounts_au_ip_addr_3cb18d_idx'),
+        ),
+    ]
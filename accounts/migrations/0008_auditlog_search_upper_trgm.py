@@ -0,0 +1,55 @@
+# Índices de trigramas sobre UPPER(coluna) no PostgreSQL.
+#
+# O ICONTAINS do Django no PostgreSQL é compilado como
+#     UPPER("coluna"::text) LIKE UPPER('%termo%')
+# e os índices da migração 0005, sobre a coluna pura, nunca eram usados pelo
+# planejador. Os novos índices têm a mesma expressão da consulta.
+
+from django.db import migrations, transaction
+
+COLUMNS = ('username', 'description', 'path')
+
+FORWARD = [
+    *(f'DROP INDEX IF EXISTS accounts_au_{column}_trgm' for column in COLUMNS),
+    *(
+        f'CREATE INDEX IF NOT EXISTS accounts_au_{column}_upper_trgm '
+        f'ON accounts_auditlog USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        for column in COLUMNS
+    ),
+]
+
+REVERSE = [
+    *(f'DROP INDEX IF EXISTS accounts_au_{column}_upper_trgm' for column in COLUMNS),
+    *(
+        f'CREATE INDEX IF NOT EXISTS accounts_au_{column}_trgm '
+        f'ON accounts_auditlog USING gin ({column} gin_trgm_ops)'
+        for column in COLUMNS
+    ),
+]
+
+
+def run_statements(statements):
+    def operation(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != 'postgresql':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                # Sem pg_trgm (ver 0005) a busca segue com ICONTAINS sem índice
+                return
+            with transaction.atomic(using=connection.alias):
+                for statement in statements:
+                    cursor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_auditlog_ip_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(FORWARD), run_statements(REVERSE)),
+    ]
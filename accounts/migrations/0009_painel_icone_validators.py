@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:40
+
+import accounts.icons
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_auditlog_search_upper_trgm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='categoriapainel',
+            name='icone',
+            field=models.CharField(default='bi-bar-chart-line', help_text='Classe do Bootstrap Icons incluída na fonte do sistema (ex: bi-bar-chart-line); outros ícones exigem gerar a fonte de novo (comando subset_icons --extra)', max_length=50, validators=[accounts.icons.validate_icon], verbose_name='Ícone Bootstrap'),
+        ),
+        migrations.AlterField(
+            model_name='painelbi',
+            name='icone',
+            field=models.CharField(default='bi-file-earmark-bar-graph', help_text='Classe do Bootstrap Icons incluída na fonte do sistema (ex: bi-file-earmark-bar-graph); outros ícones exigem gerar a fonte de novo (comando subset_icons --extra)', max_length=50, validators=[accounts.icons.validate_icon], verbose_name='Ícone Bootstrap'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:40
+#
+# A tela de auditoria filtra usuário pela busca textual (FTS/trigramas) e não
+# filtra por severidade: os índices da migração 0006 só custavam escrita.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_painel_icone_validators'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='accounts_au_usernam_ca0969_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='accounts_au_severit_2992a7_idx',
+        ),
+    ]
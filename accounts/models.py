@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .icons import validate_icon
+
 
 class AuditLog(models.Model):
     """
@@ -106,6 +108,7 @@ class AuditLog(models.Model):
             models.Index(fields=['-timestamp']),
             models.Index(fields=['user', '-timestamp']),
             models.Index(fields=['action', '-timestamp']),
+            models.Index(fields=['ip_address', '-timestamp']),
         ]
     
     def __str__(self):
@@ -155,8 +158,12 @@ class CategoriaPainel(models.Model):
     icone = models.CharField(
         max_length=50,
         default='bi-bar-chart-line',
+        validators=[validate_icon],
         verbose_name='Ícone Bootstrap',
-        help_text='Classe do Bootstrap Icons (ex: bi-bar-chart-line)'
+        help_text=(
+            'Classe do Bootstrap Icons incluída na fonte do sistema (ex: bi-bar-chart-line); '
+            'outros ícones exigem gerar a fonte de novo (comando subset_icons --extra)'
+        )
     )
     ordem = models.PositiveIntegerField(
         default=0,
@@ -221,8 +228,12 @@ class PainelBI(models.Model):
     icone = models.CharField(
         max_length=50,
         default='bi-file-earmark-bar-graph',
+        validators=[validate_icon],
         verbose_name='Ícone Bootstrap',
-        help_text='Classe do Bootstrap Icons (ex: bi-file-earmark-bar-graph)'
+        help_text=(
+            'Classe do Bootstrap Icons incluída na fonte do sistema (ex: bi-file-earmark-bar-graph); '
+            'outros ícones exigem gerar a fonte de novo (comando subset_icons --extra)'
+        )
     )
     ordem = models.PositiveIntegerField(
         default=0,
@@ -247,3 +258,37 @@ class PainelBI(models.Model):
     @property
     def tem_iframe(self):
         return bool(self.iframe_url)
+
+
+class AuditLogStats(models.Model):
+    """
+    Totais de logs de auditoria por dia, ação e severidade.
+    Atualizado a cada gravação de AuditLog (ver audit_stats.py), permite exibir
+    totais e tendências sem percorrer a tabela de logs.
+    """
+    dia = models.DateField(verbose_name='Dia')
+    action = models.CharField(
+        max_length=20,
+        choices=AuditLog.ACTION_CHOICES,
+        verbose_name='Ação'
+    )
+    severity = models.CharField(
+        max_length=10,
+        choices=AuditLog.SEVERITY_CHOICES,
+        verbose_name='Severidade'
+    )
+    total = models.PositiveBigIntegerField(default=0, verbose_name='Total')
+
+    class Meta:
+        verbose_name = 'Estatística de Auditoria'
+        verbose_name_plural = 'Estatísticas de Auditoria'
+        ordering = ['-dia', 'action', 'severity']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dia', 'action', 'severity'],
+                name='unique_auditlogstats_dia_action_severity',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dia.strftime('%d/%m/%Y')} - {self.get_action_display()} - {self.total}"
@@ -0,0 +1,209 @@
+"""
+Paginação por cursor (keyset) e contagens baratas para tabelas grandes.
+
+Em vez de OFFSET (que percorre todas as linhas anteriores da página), a
+página é definida pelo último registro visto: (timestamp, id). A consulta
+usa o índice de timestamp e custa o mesmo na primeira ou na milésima página.
+
+Para o admin (que pagina por OFFSET), EstimatedCountPaginator evita o
+COUNT(*) da tabela inteira: usa a estimativa das estatísticas do banco ou
+uma contagem limitada.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Limite padrão das contagens exibidas (acima disso mostra "10000+")
+COUNT_CAP = 10000
+
+
+def encode_cursor(obj):
+    """Gera o cursor opaco (timestamp|id) de um registro"""
+    raw = f'{obj.timestamp.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """
+    Decodifica um cursor gerado por encode_cursor.
+
+    Returns:
+        tuple: (timestamp, id) ou None se o cursor for inválido
+    """
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        timestamp, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class KeysetPage:
+    """Página de resultados com links para registros mais novos/antigos"""
+
+    def __init__(self, object_list, has_newer, has_older):
+        self.object_list = object_list
+        self.has_newer = has_newer and bool(object_list)
+        self.has_older = has_older and bool(object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_newer or self.has_older
+
+    @property
+    def newer_cursor(self):
+        return encode_cursor(self.object_list[0]) if self.has_newer else None
+
+    @property
+    def older_cursor(self):
+        return encode_cursor(self.object_list[-1]) if self.has_older else None
+
+
+def _keyset_query(queryset, per_page, after, before):
+    """
+    Monta a consulta de uma página.
+
+    Returns:
+        tuple: (queryset limitado a per_page + 1, cursor after, cursor before)
+    """
+    before = decode_cursor(before)
+    after = decode_cursor(after) if before is None else None
+
+    if before is not None:
+        timestamp, pk = before
+        # Mais novos: percorre o índice no sentido crescente e inverte
+        queryset = (
+            queryset
+            .filter(Q(timestamp__gt=timestamp) | Q(id__gt=pk), timestamp__gte=timestamp)
+            .order_by('timestamp', 'id')
+        )
+        return queryset[:per_page + 1], after, before
+
+    queryset = queryset.order_by('-timestamp', '-id')
+    if after is not None:
+        timestamp, pk = after
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(id__lt=pk), timestamp__lte=timestamp)
+    return queryset[:per_page + 1], after, before
+
+
+def _keyset_page(rows, per_page, after, before):
+    if before is not None:
+        has_newer = len(rows) > per_page
+        return KeysetPage(rows[:per_page][::-1], has_newer=has_newer, has_older=True)
+    has_older = len(rows) > per_page
+    return KeysetPage(rows[:per_page], has_newer=after is not None, has_older=has_older)
+
+
+def keyset_paginate(queryset, per_page, after=None, before=None):
+    """
+    Pagina um queryset em ordem decrescente de (timestamp, id).
+
+    Args:
+        queryset: Queryset com campo timestamp
+        per_page: Registros por página
+        after: Cursor; retorna os registros mais antigos que ele
+        before: Cursor; retorna os registros mais novos que ele
+
+    Returns:
+        KeysetPage
+    """
+    queryset, after, before = _keyset_query(queryset, per_page, after, before)
+    return _keyset_page(list(queryset), per_page, after, before)
+
+
+async def akeyset_paginate(queryset, per_page, after=None, before=None):
+    """Versão assíncrona de keyset_paginate (ORM assíncrono)"""
+    queryset, after, before = _keyset_query(queryset, per_page, after, before)
+    return _keyset_page([obj async for obj in queryset], per_page, after, before)
+
+
+def _capped_queryset(queryset, cap):
+    return queryset.order_by().values('pk')[:cap + 1]
+
+
+def capped_count(queryset, cap=COUNT_CAP):
+    """
+    Conta no máximo `cap` + 1 linhas (COUNT sobre um subselect com LIMIT).
+
+    Returns:
+        tuple: (contagem, True se o limite foi atingido)
+    """
+    count = _capped_queryset(queryset, cap).count()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+async def acapped_count(queryset, cap=COUNT_CAP):
+    """Versão assíncrona de capped_count"""
+    count = await _capped_queryset(queryset, cap).acount()
+    if count > cap:
+        return cap, True
+    return count, False
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Nº aproximado de linhas da tabela segundo as estatísticas do banco
+    (pg_class.reltuples no PostgreSQL, sqlite_stat1 no SQLite, atualizadas
+    pelo ANALYZE/PRAGMA optimize do sqlite_maintenance).
+
+    Returns:
+        int: Estimativa ou None se não houver estatísticas
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                # O 1º número de "stat" é o total de linhas (igual em todos os índices)
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 só existe depois do primeiro ANALYZE
+        return None
+    if not row or row[0] is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    # reltuples = -1: tabela ainda não analisada
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator para o admin de tabelas grandes.
+
+    Sem filtros, o total vem de estimated_row_count (quando passa de `cap`);
+    com filtros ou busca, é contado no máximo até `cap` (capped_count) e a
+    navegação vai até a página correspondente. Use junto com
+    show_full_result_count = False.
+    """
+
+    cap = COUNT_CAP
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.cap:
+                return estimate
+        return capped_count(queryset, self.cap)[0]
@@ -0,0 +1,148 @@
+"""
+Snapshot das permissões do usuário guardado na sessão.
+
+Os grupos do usuário (ids e nomes), o indicador de Gestão e os IDs dos
+painéis liberados são calculados uma vez no login e reutilizados pelas
+requisições seguintes. O snapshot carrega a versão global de permissões
+(guardada no cache compartilhado) e só é recalculado quando essa versão
+muda — os sinais em accounts/signals.py a trocam sempre que grupos,
+associações usuário/grupo ou o grupo de acesso dos painéis são alterados.
+
+A versão é um valor aleatório, nunca um contador: se a chave sumir do cache
+(descarte por MAX_ENTRIES, reinício, limpeza do diretório), a versão nova é
+diferente de todas as anteriores e todos os snapshots são recalculados, em
+vez de um snapshot antigo coincidir com um contador reiniciado.
+"""
+
+import uuid
+
+from django.core.cache import cache
+
+from .models import PainelBI
+
+PERMISSIONS_VERSION_KEY = 'permissions:version'
+SESSION_KEY = '_permissoes'
+GESTAO_GROUP = 'Gestão'
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def get_permissions_version():
+    """Versão global atual das permissões"""
+    version = cache.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        # Chave ausente = versão desconhecida: começa uma nova (invalida tudo)
+        cache.add(PERMISSIONS_VERSION_KEY, _new_version(), timeout=None)
+        version = cache.get(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+async def aget_permissions_version():
+    """Versão assíncrona de get_permissions_version"""
+    version = await cache.aget(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        await cache.aadd(PERMISSIONS_VERSION_KEY, _new_version(), timeout=None)
+        version = await cache.aget(PERMISSIONS_VERSION_KEY)
+    return version
+
+
+def bump_permissions_version():
+    """Invalida os snapshots de todas as sessões"""
+    cache.set(PERMISSIONS_VERSION_KEY, _new_version(), timeout=None)
+
+
+def _user_groups(user):
+    return user.groups.order_by('name').values_list('id', 'name')
+
+
+def _visible_painel_ids(group_ids):
+    return PainelBI.objects.filter(ativo=True, grupo_acesso__id__in=group_ids).values_list('id', flat=True)
+
+
+def _has_full_access(user, groups):
+    return user.is_superuser or any(name == GESTAO_GROUP for _, name in groups)
+
+
+def _build_snapshot(version, user, groups, painel_ids):
+    group_names = [name for _, name in groups]
+    return {
+        'version': version,
+        'user_id': user.pk,
+        'is_superuser': user.is_superuser,
+        'group_ids': [group_id for group_id, _ in groups],
+        'group_names': group_names,
+        'is_gestao': GESTAO_GROUP in group_names,
+        'painel_ids': painel_ids,
+    }
+
+
+def _is_stale(snapshot, user):
+    return (
+        snapshot is None
+        or snapshot.get('user_id') != user.pk
+        or snapshot.get('is_superuser') != user.is_superuser
+    )
+
+
+def resolve_permissions(user):
+    """
+    Calcula as permissões do usuário a partir do banco de dados.
+
+    Returns:
+        dict: version, user_id, is_superuser, group_ids, group_names,
+              is_gestao e painel_ids (None = todos os painéis)
+    """
+    version = get_permissions_version()
+    groups = list(_user_groups(user))
+    painel_ids = None
+    if not _has_full_access(user, groups):
+        painel_ids = list(_visible_painel_ids([group_id for group_id, _ in groups]))
+    return _build_snapshot(version, user, groups, painel_ids)
+
+
+async def aresolve_permissions(user):
+    """Versão assíncrona de resolve_permissions (ORM assíncrono)"""
+    version = await aget_permissions_version()
+    groups = [group async for group in _user_groups(user)]
+    painel_ids = None
+    if not _has_full_access(user, groups):
+        painel_ids = [
+            painel_id async for painel_id in _visible_painel_ids([group_id for group_id, _ in groups])
+        ]
+    return _build_snapshot(version, user, groups, painel_ids)
+
+
+def store_permissions(request, user=None):
+    """Recalcula e grava o snapshot na sessão"""
+    snapshot = resolve_permissions(user or request.user)
+    request.session[SESSION_KEY] = snapshot
+    return snapshot
+
+
+def get_user_permissions(request):
+    """
+    Retorna o snapshot de permissões da sessão, recalculando-o apenas se a
+    versão global mudou (ou se a sessão pertence a outro usuário).
+    """
+    user = request.user
+    snapshot = request.session.get(SESSION_KEY)
+    if _is_stale(snapshot, user) or snapshot.get('version') != get_permissions_version():
+        snapshot = store_permissions(request, user)
+    return snapshot
+
+
+async def aget_user_permissions(request, user):
+    """
+    Versão assíncrona de get_user_permissions.
+
+    Args:
+        request: HttpRequest
+        user: Usuário já carregado (await request.auser())
+    """
+    snapshot = await request.session.aget(SESSION_KEY)
+    if _is_stale(snapshot, user) or snapshot.get('version') != await aget_permissions_version():
+        snapshot = await aresolve_permissions(user)
+        await request.session.aset(SESSION_KEY, snapshot)
+    return snapshot
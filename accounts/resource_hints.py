@@ -0,0 +1,58 @@
+"""
+Dicas de conexão (preconnect/dns-prefetch) para os iframes do Power BI.
+
+O iframe do painel só começa a resolver o DNS e a negociar o TLS com a
+origem do Power BI depois que o HTML é processado. Enviando as origens dos
+painéis visíveis ao usuário no cabeçalho Link da resposta, o navegador abre
+essas conexões enquanto ainda baixa a página. Proxies e CDNs que suportam
+103 Early Hints podem promover esse mesmo cabeçalho.
+"""
+
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+def url_origin(url):
+    """Origem (esquema://host[:porta]) de uma URL http(s); None se inválida"""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def embed_origins(tree, selected=None):
+    """
+    Origens distintas dos iframes dos painéis da árvore do menu.
+
+    Args:
+        tree: Árvore de accounts.menu (já filtrada pelas permissões)
+        selected: Painel selecionado; sua origem vem primeiro
+
+    Returns:
+        list: Origens, na ordem do menu
+    """
+    origins = []
+    if selected and selected.get('iframe_origin'):
+        origins.append(selected['iframe_origin'])
+    for categoria in tree:
+        for painel in categoria['paineis']:
+            origin = painel.get('iframe_origin')
+            if origin and origin not in origins:
+                origins.append(origin)
+    return origins
+
+
+def link_header(origins, preconnect_limit=None):
+    """
+    Valor do cabeçalho Link: preconnect nas primeiras origens (conexões
+    abertas têm custo) e dns-prefetch em todas.
+    """
+    if preconnect_limit is None:
+        preconnect_limit = getattr(settings, 'PAINEIS_PRECONNECT_LIMIT', 2)
+    links = []
+    for index, origin in enumerate(origins):
+        if index < preconnect_limit:
+            links.append(f'<{origin}>; rel=preconnect')
+        links.append(f'<{origin}>; rel=dns-prefetch')
+    return ', '.join(links)
@@ -0,0 +1,102 @@
+"""
+Busca textual indexada nos logs de auditoria (usuário, descrição e URL).
+
+- SQLite: tabela virtual FTS5 (accounts_auditlog_fts), mantida pelos
+  triggers criados na migração 0005, com busca por prefixo.
+- PostgreSQL: índices GIN de trigramas (pg_trgm) sobre UPPER(coluna), a
+  mesma expressão do ICONTAINS do Django (UPPER("coluna"::text) LIKE
+  UPPER(%s)); termos com menos de 3 letras não usam o índice. Para conferir:
+  search_audit_logs(AuditLog.objects.all(), 'vendas').explain() deve mostrar
+  "Bitmap Index Scan on accounts_au_description_upper_trgm".
+- Outros bancos (ou SQLite sem FTS5): ICONTAINS simples.
+
+Em todos os casos cada termo digitado é obrigatório (E entre os termos).
+
+Os resultados mantêm a ordenação por recência do queryset original.
+"""
+
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'accounts_auditlog_fts'
+SEARCH_COLUMNS = ('username', 'description', 'path')
+
+# Termos da busca: sequências de letras/dígitos (o restante é separador)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_fts_available = {}
+
+
+def fts_available(using='default'):
+    """Indica se a tabela FTS5 existe no banco (resultado em cache por alias)"""
+    if using not in _fts_available:
+        connection = connections[using]
+        _fts_available[using] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[using]
+
+
+def build_match_query(term, column=None):
+    """
+    Converte o texto digitado em uma expressão MATCH do FTS5: todos os termos
+    são obrigatórios e buscados por prefixo ("pain" encontra "Painéis").
+
+    Returns:
+        str: Expressão MATCH ou '' se não houver termos
+    """
+    tokens = TOKEN_RE.findall(term)
+    if not tokens:
+        return ''
+    query = ' AND '.join(f'"{token}"*' for token in tokens)
+    if column:
+        query = f'{column} : ({query})'
+    return query
+
+
+def search_audit_logs(queryset, term, column=None):
+    """
+    Filtra os logs pelo texto informado.
+
+    Args:
+        queryset: Queryset de AuditLog
+        term: Texto da busca
+        column: Restringe a busca a uma coluna (ex.: 'username'); None = todas
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    using = queryset.db
+    if fts_available(using):
+        match = build_match_query(term, column)
+        if not match:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match]
+        ))
+
+    # PostgreSQL (índices de trigramas) e demais bancos: cada termo precisa
+    # aparecer em alguma das colunas
+    columns = (column,) if column else SEARCH_COLUMNS
+    for token in TOKEN_RE.findall(term):
+        condition = Q()
+        for name in columns:
+            condition |= Q(**{f'{name}__icontains': token})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+async def asearch_audit_logs(queryset, term, column=None):
+    """
+    Versão para views assíncronas: a verificação da tabela FTS5 (introspecção,
+    feita uma vez por processo) roda fora do event loop.
+    """
+    if queryset.db not in _fts_available:
+        await sync_to_async(fts_available)(queryset.db)
+    return search_audit_logs(queryset, term, column)
@@ -0,0 +1,47 @@
+"""
+Sinais do app accounts.
+
+Mantêm os caches derivados do catálogo de painéis e dos grupos coerentes
+com o banco de dados.
+"""
+
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .menu import invalidate_menu_cache
+from .models import CategoriaPainel, PainelBI
+from .permissions import bump_permissions_version, store_permissions
+
+
+@receiver(post_save, sender=CategoriaPainel)
+@receiver(post_delete, sender=CategoriaPainel)
+def catalogo_alterado(sender, **kwargs):
+    """Catálogo alterado: o menu lateral precisa ser remontado"""
+    invalidate_menu_cache()
+
+
+@receiver(post_save, sender=PainelBI)
+@receiver(post_delete, sender=PainelBI)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def permissoes_alteradas(sender, **kwargs):
+    """Painéis (grupo de acesso) ou grupos alterados: menu e permissões mudam"""
+    invalidate_menu_cache()
+    bump_permissions_version()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def grupos_do_usuario_alterados(sender, action, **kwargs):
+    """Mudança de associação usuário/grupo"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_menu_cache()
+        bump_permissions_version()
+
+
+@receiver(user_logged_in)
+def calcular_permissoes_no_login(sender, request, user, **kwargs):
+    """Calcula o snapshot de permissões uma única vez, no login"""
+    if request is not None and hasattr(request, 'session'):
+        store_permissions(request, user)
@@ -0,0 +1,130 @@
+"""
+Navegação por datas (date_hierarchy) do admin sem SELECT DISTINCT.
+
+O date_hierarchy padrão lista os anos/meses/dias com registros usando
+queryset.datetimes(), que trunca e agrupa a coluna em toda a tabela. Aqui só
+o primeiro e o último registro da tabela são lidos (ORDER BY ... LIMIT 1 pelo
+índice de timestamp, sem os filtros e a busca do changelist) e os períodos
+entre eles são gerados pelo calendário; um período sem registros
+simplesmente mostra a lista vazia.
+
+Uso no template do changelist:
+    {% load admin_audit %}
+    {% range_date_hierarchy cl %}
+"""
+
+import calendar
+import datetime
+
+from django import template
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def date_bounds(queryset, field_name):
+    """
+    Primeiro e último valor do campo no queryset (duas consultas com LIMIT 1).
+
+    Returns:
+        tuple: (primeiro, último) como date, no fuso local, ou (None, None)
+    """
+    values = queryset.order_by().values_list(field_name, flat=True)
+    first = values.order_by(field_name).first()
+    if first is None:
+        return None, None
+    last = values.order_by(f'-{field_name}').first()
+    bounds = []
+    for value in (first, last):
+        if isinstance(value, datetime.datetime):
+            value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+        bounds.append(value)
+    return tuple(bounds)
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def range_date_hierarchy(cl):
+    """Mesmo contexto do {% date_hierarchy %} do admin, com os períodos calculados"""
+    if not cl.date_hierarchy:
+        return {'show': False}
+
+    field_name = cl.date_hierarchy
+    year_field = f'{field_name}__year'
+    month_field = f'{field_name}__month'
+    day_field = f'{field_name}__day'
+    year_lookup = cl.params.get(year_field)
+    month_lookup = cl.params.get(month_field)
+    day_lookup = cl.params.get(day_field)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    if year_lookup and month_lookup and day_lookup:
+        # Nenhuma consulta: o dia já está escolhido
+        day = datetime.date(int(year_lookup), int(month_lookup), int(day_lookup))
+        return {
+            'show': True,
+            'back': {
+                'link': link({year_field: year_lookup, month_field: month_lookup}),
+                'title': capfirst(formats.date_format(day, 'YEAR_MONTH_FORMAT')),
+            },
+            'choices': [{'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT'))}],
+        }
+
+    first, last = date_bounds(cl.root_queryset, field_name)
+    if first is None:
+        return {'show': True, 'back': None, 'choices': []}
+
+    if not (year_lookup or month_lookup):
+        # Mesmo nível inicial do admin: desce direto se houver um só ano/mês
+        if first.year == last.year:
+            year_lookup = first.year
+            if first.month == last.month:
+                month_lookup = first.month
+
+    if year_lookup and month_lookup:
+        year, month = int(year_lookup), int(month_lookup)
+        days = [
+            datetime.date(year, month, day)
+            for day in range(1, calendar.monthrange(year, month)[1] + 1)
+        ]
+        return {
+            'show': True,
+            'back': {'link': link({year_field: year_lookup}), 'title': str(year_lookup)},
+            'choices': [
+                {
+                    'link': link({year_field: year_lookup, month_field: month_lookup, day_field: day.day}),
+                    'title': capfirst(formats.date_format(day, 'MONTH_DAY_FORMAT')),
+                }
+                for day in days if first <= day <= last
+            ],
+        }
+
+    if year_lookup:
+        year = int(year_lookup)
+        months = [
+            datetime.date(year, month, 1) for month in range(1, 13)
+            if (first.year, first.month) <= (year, month) <= (last.year, last.month)
+        ]
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [
+                {
+                    'link': link({year_field: year_lookup, month_field: month.month}),
+                    'title': capfirst(formats.date_format(month, 'YEAR_MONTH_FORMAT')),
+                }
+                for month in months
+            ],
+        }
+
+    return {
+        'show': True,
+        'back': None,
+        'choices': [
+            {'link': link({year_field: str(year)}), 'title': str(year)}
+            for year in range(first.year, last.year + 1)
+        ],
+    }
@@ -0,0 +1,125 @@
+"""
+Filtros de intervalo de tempo para os logs de auditoria.
+
+Os filtros são convertidos em intervalos semiabertos [início, fim) sobre a
+coluna timestamp, no fuso horário configurado (TIME_ZONE). Ao contrário de
+timestamp__date, que envolve a coluna em uma função, comparações diretas
+aproveitam os índices (timestamp) e (ação/usuário/severidade, timestamp).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+# Atalhos exibidos na tela de logs
+PERIOD_CHOICES = [
+    ('hour', 'Última hora'),
+    ('today', 'Hoje'),
+    ('7d', 'Últimos 7 dias'),
+    ('30d', 'Últimos 30 dias'),
+]
+
+# Formatos aceitos e a precisão de cada um (usada para tornar o "até" inclusivo)
+DATETIME_INPUT_FORMATS = (
+    ('%Y-%m-%dT%H:%M', timedelta(minutes=1)),
+    ('%Y-%m-%dT%H:%M:%S', timedelta(seconds=1)),
+    ('%Y-%m-%d', timedelta(days=1)),
+)
+
+
+def local_midnight(day):
+    """Início (00:00, fuso configurado) de um dia"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def parse_datetime_input(value):
+    """
+    Converte o valor de um <input type="datetime-local"> (ou uma data
+    AAAA-MM-DD) em datetime com fuso.
+
+    Returns:
+        tuple: (datetime, precisão do valor informado) ou (None, None)
+    """
+    value = (value or '').strip()
+    for fmt, precision in DATETIME_INPUT_FORMATS:
+        try:
+            return timezone.make_aware(datetime.strptime(value, fmt)), precision
+        except ValueError:
+            continue
+    return None, None
+
+
+def period_range(period, now=None):
+    """
+    Intervalo [início, fim) de um atalho de PERIOD_CHOICES.
+    Os atalhos em dias começam à meia-noite (dias completos, incluindo hoje).
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    if period == 'hour':
+        return now - timedelta(hours=1), None
+    if period == 'today':
+        return local_midnight(today), local_midnight(today + timedelta(days=1))
+    if period == '7d':
+        return local_midnight(today - timedelta(days=6)), None
+    if period == '30d':
+        return local_midnight(today - timedelta(days=29)), None
+    return None, None
+
+
+def parse_time_range(params, now=None):
+    """
+    Lê o intervalo dos parâmetros da requisição.
+
+    Prioridade: period (atalho) > from/to (data e hora) > date (um dia).
+    O campo "to" é inclusivo até o minuto informado.
+
+    Returns:
+        tuple: (início, fim) com fuso; qualquer um pode ser None (aberto)
+    """
+    period = params.get('period', '')
+    if period:
+        return period_range(period, now)
+
+    start, _ = parse_datetime_input(params.get('from'))
+    end, precision = parse_datetime_input(params.get('to'))
+    if end is not None:
+        # "até 10:30" inclui todo o minuto 10:30 (ou todo o dia, se só a data)
+        end += precision
+    if start is not None or end is not None:
+        return start, end
+
+    day, _ = parse_datetime_input(params.get('date'))
+    if day is not None:
+        return day, day + timedelta(days=1)
+    return None, None
+
+
+def filter_time_range(queryset, start, end):
+    """Aplica o intervalo semiaberto [início, fim) sobre timestamp"""
+    if start is not None:
+        queryset = queryset.filter(timestamp__gte=start)
+    if end is not None:
+        queryset = queryset.filter(timestamp__lt=end)
+    return queryset
+
+
+def day_range(start, end):
+    """
+    Converte o intervalo em dias inteiros [primeiro dia, último dia) quando os
+    limites caem à meia-noite local; permite usar a tabela agregada por dia.
+
+    Returns:
+        tuple: (primeiro dia ou None, dia final exclusivo ou None), ou None
+               se algum limite não for meia-noite
+    """
+    days = []
+    for value in (start, end):
+        if value is None:
+            days.append(None)
+            continue
+        local = timezone.localtime(value)
+        if local.time() != time.min:
+            return None
+        days.append(local.date())
+    return tuple(days)
@@ -11,4 +11,5 @@ urlpatterns = [
     path('gestao/logs/', views.audit_logs_view, name='audit_logs'),
     path('paineis/', views.paineis_view, name='paineis_bi'),
     path('paineis/<int:painel_id>/', views.paineis_view, name='paineis_bi_detalhe'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
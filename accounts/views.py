@@ -1,14 +1,51 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseForbidden
+from django.shortcuts import render, redirect, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.debug import sensitive_post_parameters
-from django.core.paginator import Paginator
+from urllib.parse import urlencode
+import hashlib
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from .decorators import gestao_required
-from .models import AuditLog, CategoriaPainel, PainelBI
-from .audit_utils import log_login, log_logout, log_view, log_access_denied
+from .models import AuditLog, PainelBI
+from .audit_utils import alog, log_login, log_logout, log_view, log_access_denied
+from .login_throttle import LoginThrottle, get_config as get_throttle_config
+from .metrics import collect_metrics, render_prometheus
+from .menu import (
+    aget_catalog_modified, aget_menu_tree, aget_menu_version, first_painel, find_painel,
+    painel_menu_item,
+)
+from .audit_stats import astats_total, daily_trend
+from .pagination import acapped_count, akeyset_paginate
+from .resource_hints import embed_origins, link_header
+from .permissions import aget_user_permissions, get_user_permissions
+from .search import asearch_audit_logs
+from .time_range import PERIOD_CHOICES, day_range, filter_time_range, parse_time_range
+
+# Colunas exibidas na listagem de logs (exclui user_agent e extra_data)
+AUDIT_LOG_LIST_FIELDS = (
+    'id', 'timestamp', 'username', 'action', 'description', 'path', 'ip_address', 'severity',
+    'user', 'user__id', 'user__first_name', 'user__last_name',
+)
+
+
+async def arender(request, template_name, context):
+    """
+    render() para views assíncronas.
+
+    Os context processors e o template leem a sessão e request.user de forma
+    síncrona; a renderização roda na thread de sync_to_async. O usuário já
+    carregado por request.auser() é reaproveitado, evitando uma segunda
+    consulta.
+    """
+    request.user = await request.auser()
+    return await sync_to_async(render)(request, template_name, context)
 
 
 @sensitive_post_parameters('password')
@@ -33,9 +70,27 @@ def login_view(request):
             messages.error(request, 'Por favor, preencha todos os campos.')
             return render(request, 'accounts/login.html')
         
+        # Limite de tentativas: recusa antes do hash da senha e de qualquer consulta
+        throttle = None
+        if get_throttle_config()['ENABLED']:
+            throttle = LoginThrottle(request, username)
+            exceeded = throttle.exceeded()
+            if exceeded:
+                throttle.reject(exceeded)
+                messages.error(request, 'Muitas tentativas de login. Aguarde alguns minutos e tente novamente.')
+                response = render(request, 'accounts/login.html', status=429)
+                response['Retry-After'] = str(throttle.window)
+                return response
+        
         # Autenticação - Django já protege contra SQL injection
         user = authenticate(request, username=username, password=password)
         
+        if throttle:
+            if user is not None:
+                throttle.record_success()
+            else:
+                throttle.record_failure()
+        
         if user is not None:
             if user.is_active:
                 login(request, user)
@@ -73,19 +128,20 @@ def logout_view(request):
 
 
 @login_required
-def home_view(request):
+async def home_view(request):
     """
-    Página inicial do sistema - requer autenticação
+    Página inicial do sistema - requer autenticação (view assíncrona)
     """
-    log_view(request.user, request, 'Home')
+    user = await request.auser()
+    await alog(log_view, user, request, 'Home')
     
-    user = request.user
+    permissoes = await aget_user_permissions(request, user)
     
     # Obtém os grupos do usuário
-    grupos = user.groups.all()
+    grupos = permissoes['group_names']
     
     # Verifica se o usuário pertence ao grupo Gestão (acesso total)
-    is_gestao = user.groups.filter(name='Gestão').exists()
+    is_gestao = permissoes['is_gestao']
     
     context = {
         'user': user,
@@ -93,7 +149,7 @@ def home_view(request):
         'is_gestao': is_gestao,
     }
     
-    return render(request, 'accounts/home.html', context)
+    return await arender(request, 'accounts/home.html', context)
 
 
 @gestao_required
@@ -107,122 +163,237 @@ def gestao_dashboard(request):
     context = {
         'titulo': 'Dashboard de Gestão',
         'descricao': 'Esta página é acessível apenas para usuários do grupo Gestão.',
+        # Tendência dos últimos 7 dias, lida da tabela agregada
+        'tendencia': daily_trend(7),
     }
     return render(request, 'accounts/gestao_dashboard.html', context)
 
 
 @gestao_required
-def audit_logs_view(request):
+async def audit_logs_view(request):
     """
     View para visualizar logs de auditoria
     Apenas usuários do grupo Gestão têm acesso
+    
+    Paginação por cursor (timestamp, id) e contagens limitadas, para que o
+    custo não cresça com o tamanho da tabela. View assíncrona (ORM async).
     """
-    log_view(request.user, request, 'Logs de Auditoria')
+    await alog(log_view, await request.auser(), request, 'Logs de Auditoria')
     
     # Filtros
+    search_query = request.GET.get('q', '').strip()
     action_filter = request.GET.get('action', '')
-    user_filter = request.GET.get('user', '')
+    user_filter = request.GET.get('user', '').strip()
+    period_filter = request.GET.get('period', '')
+    from_filter = request.GET.get('from', '')
+    to_filter = request.GET.get('to', '')
     date_filter = request.GET.get('date', '')
     
-    # Query base
-    logs = AuditLog.objects.select_related('user').all()
+    # Query base (apenas as colunas exibidas na tabela)
+    logs = AuditLog.objects.select_related('user').only(*AUDIT_LOG_LIST_FIELDS)
     
     # Aplicar filtros
     if action_filter:
         logs = logs.filter(action=action_filter)
     if user_filter:
-        logs = logs.filter(username__icontains=user_filter)
-    if date_filter:
-        from datetime import datetime
-        try:
-            date_obj = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            logs = logs.filter(timestamp__date=date_obj)
-        except ValueError:
-            pass
-    
-    # Paginação
-    paginator = Paginator(logs, 50)  # 50 logs por página
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Estatísticas
-    total_logs = logs.count()
-    total_logins = AuditLog.objects.filter(action='LOGIN').count()
-    total_access_denied = AuditLog.objects.filter(action='ACCESS_DENIED').count()
+        logs = await asearch_audit_logs(logs, user_filter, column='username')
+    if search_query:
+        logs = await asearch_audit_logs(logs, search_query)
+    # Intervalo de tempo semiaberto [início, fim), sem funções sobre a coluna
+    start, end = parse_time_range(request.GET)
+    logs = filter_time_range(logs, start, end)
+    
+    # Paginação por cursor: 50 logs por página
+    page_obj = await akeyset_paginate(
+        logs, 50,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    
+    # Estatísticas: lidas da tabela agregada (AuditLogStats) em tempo constante.
+    # Busca textual e intervalos fora da meia-noite não existem no agregado:
+    # nesses casos conta até COUNT_CAP.
+    total_logs_capped = False
+    days = day_range(start, end)
+    if user_filter or search_query or days is None:
+        total_logs, total_logs_capped = await acapped_count(logs)
+    else:
+        stats_filters = {}
+        if action_filter:
+            stats_filters['action'] = action_filter
+        if days[0] is not None:
+            stats_filters['dia__gte'] = days[0]
+        if days[1] is not None:
+            stats_filters['dia__lt'] = days[1]
+        total_logs = await astats_total(**stats_filters)
+    total_logins = await astats_total(action='LOGIN')
+    total_access_denied = await astats_total(action='ACCESS_DENIED')
+    
+    # Filtros atuais, repassados nos links de paginação
+    filter_query = urlencode({
+        key: value for key, value in (
+            ('q', search_query), ('action', action_filter), ('user', user_filter),
+            ('period', period_filter), ('from', from_filter), ('to', to_filter),
+            ('date', date_filter),
+        ) if value
+    })
     
     context = {
         'page_obj': page_obj,
         'total_logs': total_logs,
+        'total_logs_capped': total_logs_capped,
         'total_logins': total_logins,
         'total_access_denied': total_access_denied,
+        'search_query': search_query,
         'action_filter': action_filter,
         'user_filter': user_filter,
+        'period_filter': period_filter,
+        'from_filter': from_filter,
+        'to_filter': to_filter,
         'date_filter': date_filter,
+        'period_choices': PERIOD_CHOICES,
+        'filter_query': filter_query,
         'action_choices': AuditLog.ACTION_CHOICES,
     }
     
-    return render(request, 'accounts/audit_logs.html', context)
+    return await arender(request, 'accounts/audit_logs.html', context)
+
+
+def paineis_etag(request, user, permissoes, menu_version, painel_id):
+    """
+    ETag da página de painéis: muda com o catálogo (versão do menu), com as
+    permissões, com o painel selecionado e com o login do usuário (token CSRF
+    embutido na página).
+    """
+    raw = '|'.join(str(value) for value in (
+        menu_version,
+        permissoes['version'],
+        user.pk,
+        user.last_login.timestamp() if user.last_login else '',
+        painel_id or '',
+        request.get_full_path(),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ))
+    return '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
 
 
 @login_required
-def paineis_view(request, painel_id=None):
+async def paineis_view(request, painel_id=None):
     """
     View principal dos Painéis BI com menu lateral.
     - Grupo Gestão: vê TODOS os painéis de todas as categorias.
     - Outros grupos: vêem apenas os painéis vinculados ao seu grupo.
+    
+    O menu vem do cache (accounts.menu), por conjunto de grupos do usuário.
+    View assíncrona: consultas pelo ORM async e auditoria em segundo plano.
+    
+    Responde 304 (sem renderizar) quando o ETag enviado pelo navegador
+    confere; o acesso continua sendo registrado na auditoria.
     """
-    user = request.user
-    is_gestao = user.groups.filter(name='Gestão').exists() or user.is_superuser
-    user_group_ids = list(user.groups.values_list('id', flat=True))
+    user = await request.auser()
+    permissoes = await aget_user_permissions(request, user)
+    is_gestao = permissoes['is_gestao'] or user.is_superuser
+    user_group_ids = permissoes['group_ids']
     
-    # Filtra painéis conforme o grupo do usuário
-    if is_gestao:
-        paineis_permitidos = PainelBI.objects.filter(ativo=True, categoria__ativo=True)
-    else:
-        # Usuário comum: só vê painéis do seu grupo
-        paineis_permitidos = PainelBI.objects.filter(
-            ativo=True,
-            categoria__ativo=True,
-            grupo_acesso__id__in=user_group_ids
-        )
-    
-    # IDs dos painéis permitidos para filtrar categorias
-    paineis_ids = paineis_permitidos.values_list('id', flat=True)
-    
-    # Só exibe categorias que tenham painéis permitidos
-    categorias_ids = paineis_permitidos.values_list('categoria_id', flat=True).distinct()
-    categorias = CategoriaPainel.objects.filter(
-        id__in=categorias_ids, ativo=True
-    ).prefetch_related('paineis')
+    # Menu lateral: só categorias com painéis permitidos ao usuário
+    menu_version = await aget_menu_version()
+    categorias = await aget_menu_tree(None if is_gestao else user_group_ids, version=menu_version)
     
     painel_selecionado = None
     categoria_ativa = None
     
     if painel_id:
-        painel_selecionado = get_object_or_404(PainelBI, id=painel_id, ativo=True)
-        # Verifica permissão: Gestão pode tudo, outros só o próprio grupo
-        if not is_gestao and painel_selecionado.grupo_acesso_id not in user_group_ids:
-            log_access_denied(user, request, request.path)
-            messages.error(request, 'Você não tem permissão para acessar este painel.')
-            return redirect('accounts:paineis_bi')
-        categoria_ativa = painel_selecionado.categoria
-        log_view(user, request, f'Painel BI: {painel_selecionado.titulo}')
+        painel_selecionado = find_painel(categorias, painel_id)
+        if painel_selecionado is None:
+            # Fora do menu: inexistente, em categoria inativa ou sem permissão
+            painel = await aget_object_or_404(
+                PainelBI.objects.select_related('categoria'), id=painel_id, ativo=True
+            )
+            # Verifica permissão: Gestão pode tudo, outros só o próprio grupo
+            if not is_gestao and painel.id not in permissoes['painel_ids']:
+                await alog(log_access_denied, user, request, request.path)
+                messages.error(request, 'Você não tem permissão para acessar este painel.')
+                return redirect('accounts:paineis_bi')
+            painel_selecionado = painel_menu_item(painel)
+        categoria_ativa = painel_selecionado['categoria']
+        await alog(log_view, user, request, f'Painel BI: {painel_selecionado["titulo"]}')
     else:
         # Seleciona o primeiro painel disponível
-        primeiro_painel = paineis_permitidos.first()
+        primeiro_painel = first_painel(categorias)
         if primeiro_painel:
             painel_selecionado = primeiro_painel
-            categoria_ativa = primeiro_painel.categoria
-            log_view(user, request, f'Painéis BI (auto: {primeiro_painel.titulo})')
+            categoria_ativa = primeiro_painel['categoria']
+            await alog(log_view, user, request, f'Painéis BI (auto: {primeiro_painel["titulo"]})')
         else:
-            log_view(user, request, 'Painéis BI (sem painéis disponíveis)')
+            await alog(log_view, user, request, 'Painéis BI (sem painéis disponíveis)')
+    
+    # Requisição condicional: nada mudou desde a última visita. Só o ETag
+    # decide o 304 (a data do catálogo não cobre o que muda por usuário);
+    # mensagens pendentes (ex.: acesso negado) exigem a página renderizada.
+    etag = paineis_etag(request, user, permissoes, menu_version, painel_id)
+    last_modified = http_date((await aget_catalog_modified()).timestamp())
+    if not len(messages.get_messages(request)):
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            not_modified['Last-Modified'] = last_modified
+            patch_cache_control(not_modified, private=True, no_cache=True)
+            return not_modified
+    
+    # Dicas de conexão para as origens do Power BI (?hints=0 desliga, para
+    # comparar o tempo de carregamento do iframe com e sem elas)
+    resource_hints = (
+        getattr(settings, 'PAINEIS_RESOURCE_HINTS', True) and request.GET.get('hints') != '0'
+    )
     
     context = {
         'categorias': categorias,
         'painel_selecionado': painel_selecionado,
         'categoria_ativa': categoria_ativa,
         'is_gestao': is_gestao,
-        'paineis_ids': set(paineis_ids),
+        'resource_hints': resource_hints,
+        'medir_tempo': 'timing' in request.GET,
     }
     
-    return render(request, 'accounts/paineis_bi.html', context)
+    response = await arender(request, 'accounts/paineis_bi.html', context)
+    if resource_hints:
+        origins = embed_origins(categorias, painel_selecionado)
+        if origins:
+            response['Link'] = link_header(origins)
+    # O navegador guarda a página, mas sempre revalida (If-None-Match)
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def is_local_request(request):
+    """
+    Requisição feita na própria máquina (ex.: Prometheus no mesmo host).
+    Requisições repassadas por um proxy local (com X-Forwarded-For) não contam.
+    """
+    return (
+        request.META.get('REMOTE_ADDR') in LOOPBACK_ADDRESSES
+        and 'HTTP_X_FORWARDED_FOR' not in request.META
+    )
+
+
+@never_cache
+def metrics_view(request):
+    """
+    Métricas de desempenho por view no formato texto do Prometheus.
+    Acesso restrito a localhost e ao grupo Gestão.
+    """
+    user = request.user
+    allowed = is_local_request(request) or (
+        user.is_authenticated and (user.is_superuser or get_user_permissions(request)['is_gestao'])
+    )
+    if not allowed:
+        return HttpResponseForbidden('Acesso restrito')
+    return HttpResponse(
+        render_prometheus(collect_metrics()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,14 +1,30 @@
 #!/bin/sh
 set -e
 
-echo "Aplicando migrations..."
-python manage.py migrate --noinput
+# Execução avulsa de um comando do Django (ex.: docker run <imagem> migrate)
+if [ "$#" -gt 0 ]; then
+    exec python manage.py "$@"
+fi
 
-echo "Coletando arquivos estáticos..."
-python manage.py collectstatic --noinput
+# DJANGO_MIGRATE:
+#   auto (padrão): aplica as migrations somente se migrate --check indicar pendências
+#   always: sempre executa migrate
+#   never: não verifica (migrations aplicadas por um job avulso: <imagem> migrate)
+case "${DJANGO_MIGRATE:-auto}" in
+    auto)
+        if ! python manage.py migrate --check --noinput > /dev/null 2>&1; then
+            echo "Aplicando migrations..."
+            python manage.py migrate --noinput
+        fi
+        ;;
+    always)
+        echo "Aplicando migrations..."
+        python manage.py migrate --noinput
+        ;;
+esac
 
+# Arquivos estáticos são coletados no build da imagem (Dockerfile)
+
+# Workers, threads e modo (DJANGO_SERVER_MODE=wsgi|asgi) em gunicorn.conf.py
 echo "Iniciando Gunicorn..."
-exec gunicorn paineis_bi.wsgi:application \
-    --bind 0.0.0.0:8002 \
-    --workers 3 \
-    --timeout 120
+exec gunicorn --config gunicorn.conf.py
@@ -0,0 +1,99 @@
+"""
+Perfil do Gunicorn (lido pelo entrypoint.sh: gunicorn --config gunicorn.conf.py).
+
+Todos os valores podem ser ajustados por variáveis de ambiente:
+    DJANGO_SERVER_MODE: wsgi (padrão) ou asgi (workers uvicorn)
+    GUNICORN_BIND: endereço (padrão 0.0.0.0:8002)
+    GUNICORN_WORKERS: nº de processos (padrão 2 x CPUs + 1)
+    GUNICORN_WORKER_CLASS: gthread (padrão) ou sync; ignorado no modo asgi
+    GUNICORN_THREADS: threads por worker gthread (padrão 4)
+    GUNICORN_TIMEOUT / GUNICORN_GRACEFUL_TIMEOUT / GUNICORN_KEEPALIVE
+    GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: reciclagem dos workers
+    GUNICORN_PRELOAD: carrega o Django no processo mestre (padrão True)
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+CPU_COUNT = multiprocessing.cpu_count()
+
+SERVER_MODE = os.getenv('DJANGO_SERVER_MODE', 'wsgi').lower()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8002')
+
+workers = int(os.getenv('GUNICORN_WORKERS', str(CPU_COUNT * 2 + 1)))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'paineis_bi.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'paineis_bi.wsgi:application'
+    # gthread: enquanto uma thread espera o banco, as outras atendem (as
+    # páginas dos painéis passam a maior parte do tempo em I/O)
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recicla cada worker após N requisições (com variação aleatória, para que
+# não reiniciem todos juntos), limitando o crescimento de memória
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Importa o Django (e compila os templates) uma vez no mestre: os workers
+# compartilham essa memória por copy-on-write e sobem mais rápido
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+accesslog = os.getenv('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOGLEVEL', 'info')
+
+
+def when_ready(server):
+    """Com preload_app, compila os templates antes do fork dos workers"""
+    if not server.cfg.preload_app:
+        return
+    from django.template import TemplateDoesNotExist, TemplateSyntaxError
+    from django.template.loader import get_template
+
+    templates_dir = BASE_DIR / 'templates'
+    for path in templates_dir.rglob('*.html'):
+        try:
+            get_template(path.relative_to(templates_dir).as_posix())
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            server.log.warning('Template não pré-carregado: %s', path)
+
+
+def post_fork(server, worker):
+    # Conexões abertas no mestre não podem ser compartilhadas entre processos
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+
+
+def worker_exit(server, worker):
+    """Encerramento do worker: grava o que ainda está em memória"""
+    from django.db import connections
+
+    try:
+        from accounts.audit_buffer import flush_audit_buffer, wait_audit_tasks
+
+        wait_audit_tasks()
+        flushed = flush_audit_buffer()
+        if flushed:
+            server.log.info('Worker %s: %d logs de auditoria gravados no encerramento', worker.pid, flushed)
+
+        from accounts.metrics import retire_metrics
+
+        # Totais do worker vão para o archive.json: /metrics não perde contagens
+        retire_metrics()
+    except Exception:
+        server.log.exception('Worker %s: falha ao gravar os buffers no encerramento', worker.pid)
+    finally:
+        connections.close_all()
@@ -0,0 +1,48 @@
+"""
+Test runner do projeto (settings.TEST_RUNNER).
+
+Aplica, só enquanto os testes rodam, os valores que não valem em produção;
+as configurações de produção não dependem de como o processo foi iniciado.
+
+- staticfiles sem manifesto (nos testes não há collectstatic)
+- caches em memória (o FileBasedCache padrão é compartilhado em /tmp com o
+  servidor de desenvolvimento e com outras execuções dos testes)
+- métricas desligadas (não gravam no diretório compartilhado)
+- agrupamento de auditoria desligado (as janelas sobreviveriam ao rollback
+  de cada teste); os testes do agrupamento o ligam com override_settings
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def runner_settings():
+    """Valores sobrepostos às configurações durante os testes"""
+    return {
+        'CACHES': {
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+            'login_throttle': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'login_throttle',
+            },
+        },
+        'STORAGES': {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        },
+        'METRICS': {**settings.METRICS, 'ENABLED': False},
+        'AUDIT_LOG_BUFFER': {**settings.AUDIT_LOG_BUFFER, 'COALESCE_ACTIONS': []},
+    }
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.runner_settings = override_settings(**runner_settings())
+        self.runner_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.runner_settings.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,68 @@
+/*
+ * Medição do tempo até o carregamento do iframe do painel (sem Lighthouse).
+ *
+ * Abra /paineis/<id>/?timing=1 (com as dicas de conexão) ou
+ * /paineis/<id>/?timing=1&hints=0 (sem elas). Cada carregamento registra o
+ * tempo, desde o início da navegação, até o evento load do iframe; os
+ * resultados ficam no localStorage e o resumo é exibido no console.
+ *
+ *   &runs=N      recarrega a página até juntar N medições do modo atual
+ *   ?timing=reset  apaga as medições
+ *
+ * Conexões já abertas com o Power BI distorcem a comparação: feche os
+ * sockets (chrome://net-internals/#sockets) ou use uma janela anônima nova
+ * entre as rodadas.
+ */
+(function() {
+    const STORAGE_KEY = 'paineis:timing';
+    const params = new URLSearchParams(window.location.search);
+    const iframe = document.getElementById('painelIframe');
+
+    if (params.get('timing') === 'reset') {
+        localStorage.removeItem(STORAGE_KEY);
+        console.info('[timing] medições apagadas');
+        return;
+    }
+    if (!iframe) {
+        console.warn('[timing] painel sem iframe');
+        return;
+    }
+
+    const mode = params.get('hints') === '0' ? 'sem dicas' : 'com dicas';
+    const runs = parseInt(params.get('runs') || '0', 10);
+
+    function percentile(values, pct) {
+        const sorted = values.slice().sort(function(a, b) { return a - b; });
+        const index = Math.min(sorted.length - 1, Math.ceil(pct / 100 * sorted.length) - 1);
+        return sorted[Math.max(index, 0)];
+    }
+
+    function record(loadedAt) {
+        const results = JSON.parse(localStorage.getItem(STORAGE_KEY) || '{}');
+        results[mode] = (results[mode] || []).concat([Math.round(loadedAt)]);
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(results));
+
+        const summary = {};
+        Object.keys(results).forEach(function(key) {
+            const values = results[key];
+            summary[key] = {
+                'medições': values.length,
+                'mínimo (ms)': Math.min.apply(null, values),
+                'mediana (ms)': percentile(values, 50),
+                'p75 (ms)': percentile(values, 75),
+            };
+        });
+        console.info('[timing] iframe carregado em ' + Math.round(loadedAt) + ' ms (' + mode + ')');
+        console.table(summary);
+
+        if (runs && results[mode].length < runs) {
+            setTimeout(function() { window.location.reload(); }, 500);
+        }
+    }
+
+    if (window.painelIframeLoadedAt) {
+        record(window.painelIframeLoadedAt);
+    } else {
+        iframe.addEventListener('load', function() { record(performance.now()); }, { once: true });
+    }
+})();